@@ -0,0 +1,48 @@
+'''
+Microbenchmark: UntisBreaks.BreakSchedule against the sort-per-call helpers next_break_time and get_relative_break.
+Run from the project folder:  python -m benchmarks.bench_break_schedule [--breaks 8] [--number 2000]
+'''
+import argparse
+import random
+import timeit
+from datetime import datetime, timedelta
+
+from src import UntisBreaks
+
+
+def _break_times(count):
+    day = datetime(2024, 1, 8, 7, 45)
+    return [day + timedelta(minutes=45*i + 5) for i in range(count)]
+
+
+def _cases(times):
+    schedule_build = lambda: UntisBreaks.BreakSchedule(times)
+    schedule = schedule_build()
+    options = dict.fromkeys(times).keys()    # DisplayFrame used to pass data.keys()
+    probes = [random.choice(times) + timedelta(minutes=random.randint(-30, 30)) for _ in range(64)]
+    selected = [random.choice(times) for _ in range(64)]
+    return [
+        ("next_break_time", lambda: [UntisBreaks.next_break_time(options, p) for p in probes]),
+        ("BreakSchedule.next", lambda: [schedule.next(p) for p in probes]),
+        ("get_relative_break", lambda: [UntisBreaks.get_relative_break(s, options, 1) for s in selected]),
+        ("BreakSchedule.relative", lambda: [schedule.relative(s, 1) for s in selected]),
+        ("BreakSchedule()", schedule_build),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--breaks", type=int, default=8, help="number of breaks per day")
+    parser.add_argument("--number", type=int, default=2000, help="repetitions per measurement")
+    args = parser.parse_args()
+
+    random.seed(0)
+    times = _break_times(args.breaks)
+    print(f"{args.breaks} breaks, 64 queries per call, best of 5")
+    for name, case in _cases(times):
+        best = min(timeit.repeat(case, number=args.number, repeat=5))
+        print(f"{name:<24}{best / args.number * 1e6:10.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+'''
+Startup benchmark: time-to-first-window (login window drawn) and time-to-first-table (first supervisions shown).
+Every run is a fresh interpreter, so import costs count like for a real start. The table is filled from an
+in-process synthetic school, no server is needed, but a display is (Tk window).
+Run from the project folder:  python -m benchmarks.bench_startup [--runs 5] [--teachers 8]
+'''
+import argparse
+import datetime
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+class _Obj:
+    def __init__(self, **kwargs): self.__dict__.update(kwargs)
+
+
+class _Periods(list):
+    def filter(self, type=None): return _Periods(p for p in self if p.type == type)
+
+
+'''
+Offers the session methods UntisBreaks and DisplayFrame use: every teacher has one supervision per school day.
+'''
+class _SyntheticSession:
+
+
+    def __init__(self, teachers: int):
+        self.config = {"server": "synthetic", "school": "bench", "username": "bench"}
+        self._teachers = [_Obj(id=i, full_name=f"Lehrer {i}") for i in range(teachers)]
+
+
+    def teachers(self): return self._teachers
+    def rooms(self): return []
+    def timegrid_units(self): return []
+    def holidays(self): return []
+    def schoolyears(self): return []
+    def last_import_time(self): return _Obj(date=datetime.datetime(2024, 1, 1))
+    def logout(self, suppress_errors=False): pass
+
+
+    def timetable(self, teacher, start, end):
+        periods, day = _Periods(), start
+        while day <= end:
+            begin = datetime.datetime.combine(day, datetime.time(9, 30)) + datetime.timedelta(minutes=100 * (teacher % 3))
+            periods.append(_Obj(id=teacher * 10 + day.weekday(), start=begin, end=begin + datetime.timedelta(minutes=20), code=None,
+                                type='bs', teachers=[self._teachers[teacher]], original_teachers=[], rooms=[], original_rooms=[],
+                                _data={'te': [{'id': teacher}], 'ro': []}))
+            day += datetime.timedelta(days=1)
+        return periods
+
+
+
+'''
+One measured start, prints its timestamps (time.time()) as json on stdout.
+'''
+def _child(teachers: int, timeout_ms: int):
+    stamps = {"start": time.time()}
+    import src.Application as App
+    stamps["imported"] = time.time()
+    root = App.MainFrame()
+    root.selectLoginFrame()
+    root.update()
+    stamps["window"] = time.time()
+    stamps["webuntis_at_window"] = "webuntis" in sys.modules
+
+    def on_table(event):
+        content = root.content
+        if "table" not in stamps: stamps["table"] = time.time()
+        if content.data and any(content.data.values()):
+            stamps["filled"] = time.time()
+            root.destroy()
+
+    root.bind("<<TableShown>>", on_table)
+    root.after(0, lambda: _show_display(root, teachers))
+    root.after(timeout_ms, root.destroy)
+    App.tk.Tk.mainloop(root)
+    print(json.dumps(stamps))
+
+
+'''
+On weekends the display would stay empty, so it pretends to be on the next weekday (before its first load starts).
+'''
+def _show_display(root, teachers: int):
+    root.selectDisplayFrame(_SyntheticSession(teachers))
+    weekday = datetime.date.today().weekday()
+    root.content.natural_offset = 7 - weekday if weekday >= 5 else 0
+
+
+def _run(args) -> dict:
+    env = {**os.environ, "USERPROFILE": tempfile.mkdtemp()}    # keeps the real config.ini and cache untouched
+    spawned = time.time()
+    out = subprocess.run([sys.executable, "-m", "benchmarks.bench_startup", "--child", "--teachers", str(args.teachers), "--timeout", str(args.timeout)],
+                         env=env, capture_output=True, text=True, check=True).stdout
+    stamps = json.loads(out.strip().splitlines()[-1])
+    stamps["spawned"] = spawned
+    return stamps
+
+
+def _ms(values):
+    return f"{statistics.median(values)*1000:8.1f} ms (min {min(values)*1000:.1f})" if values else "     n/a"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--teachers", type=int, default=8, help="synthetic teachers, sweeps are rate limited like real ones")
+    parser.add_argument("--timeout", type=int, default=30000, help="ms until a run gives up waiting for the table")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return _child(args.teachers, args.timeout)
+
+    runs = [_run(args) for _ in range(args.runs)]
+    print(f"{args.runs} runs, {args.teachers} teachers (median)")
+    print(f"  interpreter + imports  {_ms([r['imported'] - r['spawned'] for r in runs])}")
+    print(f"  first window           {_ms([r['window'] - r['spawned'] for r in runs])}")
+    print(f"  first table            {_ms([r['table'] - r['spawned'] for r in runs if 'table' in r])}")
+    print(f"  first supervisions     {_ms([r['filled'] - r['spawned'] for r in runs if 'filled' in r])}")
+    print(f"  webuntis imported before the window: {any(r['webuntis_at_window'] for r in runs)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+'''
+Scaling benchmark of the supervision pipeline against synthetic schools served by src.ReplayServer
+(a real webuntis.Session talks to it over HTTP, so request round trips count like for a real school).
+Measures per school size:
+    get_offset_supervisions   full sweep over all teachers (fresh session every repetition)
+    _group_by_start           grouping the fetched supervisions by break start
+    next_break_time / get_relative_break, and BreakSchedule for comparison
+    _create_table             building and filling the table of the fullest break (needs a display, else skipped)
+Results are written as json. Run from the project folder:
+    python -m benchmarks.bench_synthetic_school [--teachers 20 80 250] [--per-break 6] [--cancelled 0.1]
+                                                [--irregular 0.1] [--rtt 30] [--repeat 3] [--output results.json]
+'''
+import argparse
+import datetime
+import json
+import platform
+import random
+import statistics
+import sys
+import threading
+import time
+import timeit
+
+import webuntis
+from src import Constants, ReplayServer, UntisBreaks
+
+
+BREAKS = ((9, 30, 20), (11, 10, 15), (12, 45, 30), (14, 15, 10))     # start hour, minute, duration of the breaks
+
+
+def _untis_date(day: datetime.date) -> int:
+    return int(day.strftime("%Y%m%d"))
+
+
+'''
+@return the next weekday from today on and its offset, the synthetic school has its supervisions there
+'''
+def _school_day() -> tuple:
+    offset = 0
+    while (datetime.date.today() + datetime.timedelta(days=offset)).weekday() >= 5:
+        offset += 1
+    return datetime.date.today() + datetime.timedelta(days=offset), offset
+
+
+'''
+Recording of a school (see ReplayServer) with 'per_break' supervisions in every break of 'day',
+spread over random teachers. 'cancelled' and 'irregular' are the shares of entries with that code,
+irregular ones have a substitute teacher (the original teacher is kept as orgid).
+'''
+def synthetic_school(teachers: int, per_break: int, cancelled: float, irregular: float, day: datetime.date, seed: int=0) -> dict:
+    rng = random.Random(seed)
+    rooms = [{"id": i, "name": f"H{i}", "longName": f"Hof {i}"} for i in range(1, 9)]
+    staff = [{"id": i, "name": f"L{i:03}", "foreName": "Lehrer", "longName": f"Nr. {i}", "title": ""} for i in range(1, teachers + 1)]
+    timetables = {teacher["id"]: [] for teacher in staff}
+    period_id = 1
+    for hour, minute, duration in BREAKS:
+        start = hour * 100 + minute
+        end = (hour + (minute + duration) // 60) * 100 + (minute + duration) % 60
+        for teacher in rng.sample(staff, min(per_break, teachers)):
+            period = {"id": period_id, "date": _untis_date(day), "startTime": start, "endTime": end, "lstype": "bs",
+                      "kl": [], "su": [], "te": [{"id": teacher["id"]}], "ro": [{"id": rng.choice(rooms)["id"]}]}
+            roll = rng.random()
+            if roll < cancelled:
+                period["code"] = "cancelled"
+            elif roll < cancelled + irregular and teachers > 1:
+                period["code"] = "irregular"
+                period["te"] = [{"id": teacher["id"], "orgid": rng.choice([t for t in staff if t is not teacher])["id"]}]
+            timetables[teacher["id"]].append(period)
+            period_id += 1
+    calls = [{"method": "getTeachers", "params": {}, "result": staff},
+             {"method": "getRooms", "params": {}, "result": rooms}]
+    for teacher_id, periods in timetables.items():
+        params = {"id": teacher_id, "type": 2, "startDate": _untis_date(day), "endDate": _untis_date(day)}
+        calls.append({"method": "getTimetable", "params": params, "result": periods})
+    return {"recorded_on": day.isoformat(), "login": {"personType": 2, "personId": 0}, "calls": calls}
+
+
+def _summary(seconds: list) -> dict:
+    return {"median_ms": statistics.median(seconds) * 1000, "min_ms": min(seconds) * 1000, "runs": len(seconds)}
+
+
+def _timeit(fn, number: int) -> dict:
+    runs = timeit.repeat(fn, number=number, repeat=5)
+    return _summary([run / number for run in runs])
+
+
+def _sweep(url: str, offset: int, repeat: int) -> tuple:
+    times, data = [], None
+    for _ in range(repeat):
+        session = webuntis.Session(server=url, username="bench", password="bench", school="bench", useragent=Constants.USER_AGENT)
+        session.login()
+        start = time.perf_counter()
+        data = UntisBreaks.get_offset_supervisions(session, offset)
+        times.append(time.perf_counter() - start)
+        session.logout(suppress_errors=True)
+    return _summary(times), data
+
+
+def _break_helpers(data: dict) -> dict:
+    times = list(data.keys())
+    schedule = UntisBreaks.BreakSchedule(times)
+    probe = min(times) + datetime.timedelta(minutes=1)
+    return {
+        "next_break_time": _timeit(lambda: UntisBreaks.next_break_time(times, probe), 2000),
+        "get_relative_break": _timeit(lambda: UntisBreaks.get_relative_break(times[0], times, 1), 2000),
+        "BreakSchedule.next": _timeit(lambda: schedule.next(probe), 2000),
+        "BreakSchedule.relative": _timeit(lambda: schedule.relative(times[0], 1), 2000),
+    }
+
+
+'''
+Builds a DisplayFrame without loading anything and times _create_table plus filling it with the fullest break.
+'''
+def _table_build(data: dict, repeat: int) -> dict:
+    import tkinter as tk
+    from src import DisplayFrame
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        return {"skipped": str(e)}
+    try:
+        display = DisplayFrame.DisplayFrame(root, None, index=object())
+        display._set_data(data)
+        display.currentBreak = max(data, key=lambda start: len(data[start]))
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            table = display._create_table(display.table_frame)
+            display.table = table
+            display._fill_table()
+            root.update_idletasks()
+            times.append(time.perf_counter() - start)
+            table.destroy()
+        return {**_summary(times), "mode": Constants.TABLE_MODE, "columns": len(data[display.currentBreak])}
+    finally:
+        root.destroy()
+
+
+def run_school(args, teachers: int) -> dict:
+    day, offset = _school_day()
+    recording = synthetic_school(teachers, args.per_break, args.cancelled, args.irregular, day, args.seed)
+    server = ReplayServer.ReplayServer(("127.0.0.1", 0), recording, latency=args.rtt / 1000)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        sweep, data = _sweep(server.url, offset, args.repeat)
+    finally:
+        server.shutdown()
+        server.server_close()
+    supervisions = [sup for sups in data.values() for sup in sups]
+    return {
+        "teachers": teachers, "supervisions": len(supervisions), "breaks": len(data),
+        "get_offset_supervisions": sweep,
+        "_group_by_start": _timeit(lambda: UntisBreaks._group_by_start(supervisions), 200),
+        **_break_helpers(data),
+        "_create_table": _table_build(data, args.repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--teachers", type=int, nargs="+", default=[20, 80, 250], help="school sizes to run")
+    parser.add_argument("--per-break", type=int, default=6, help="supervisions per break")
+    parser.add_argument("--cancelled", type=float, default=0.1, help="share of cancelled supervisions")
+    parser.add_argument("--irregular", type=float, default=0.1, help="share of irregular supervisions (substitutes)")
+    parser.add_argument("--rtt", type=float, default=30, help="ms round trip of every request")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="json file, default: stdout")
+    args = parser.parse_args()
+
+    results = {
+        "benchmark": "synthetic_school", "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(), "fetch_workers": Constants.FETCH_WORKERS,
+        "parameters": {k: v for k, v in vars(args).items() if k != "output"},
+        "schools": [],
+    }
+    for teachers in args.teachers:
+        print(f"school with {teachers} teachers ...", file=sys.stderr)
+        results["schools"].append(run_school(args, teachers))
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,17 @@
 import sys, os
-from threading import Thread
+import importlib
 from configparser import ConfigParser
+from typing import TYPE_CHECKING
 
 import tkinter as tk
 from tkinter.messagebox import showerror
 
-from src import DisplayFrame, Constants, TKUtils
-import webuntis
+# modules needed after the login are imported on first use (see _preload), the login window shows without them
+from src import Constants, TKUtils
+
+if TYPE_CHECKING:
+    import webuntis
+    from src import SessionManager
 
 
 
@@ -23,6 +28,14 @@ def resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 
+'''
+Imports what the display needs on the worker thread, while the user is typing into the login window.
+'''
+def _preload():
+    for module in ("src.SessionManager", "src.DisplayFrame", "src.SupervisionCache"):
+        importlib.import_module(module)
+
+
 def environ_path(relative_path):
     directory = os.environ.get('USERPROFILE') + '\\.webuntis-breaks'
     if not os.path.exists(directory):
@@ -62,31 +75,58 @@ class MainFrame(tk.Tk):
     def __init__(self):
         super().__init__()
         handle_callback_errors()
+        self._enable_timing_log()
+        self.iconphoto(False, tk.PhotoImage(file=resource_path('appIcon.png')))
         self.configure_variables()
         self.session = None
+        self.cache = None
 
 
-    def mainloop(self, session: webuntis.Session=None) -> None:
+    '''
+    @param daemon_url: address of a FetchDaemon, the display then gets its data from there and no login is needed
+    '''
+    def mainloop(self, session: 'webuntis.Session'=None, daemon_url: str=None) -> None:
         try:
+            if daemon_url: return self._start_client(daemon_url)
             self._before_start(session)
             super().mainloop()
         finally:
             self._logout()
 
 
-    def _before_start(self, session: webuntis.Session) -> None:
+    def _before_start(self, session: 'webuntis.Session') -> None:
         if self._prelogin(session):
-            return self.selectDisplayFrame(session)
+            return self.selectDisplayFrame(self.session)
         self.selectLoginFrame()
 
 
+    def _start_client(self, daemon_url: str) -> None:
+        from src import FetchDaemon
+        self.selectDisplayFrame(None, index=FetchDaemon.FetchClient(daemon_url))
+        super().mainloop()
+
+
+    '''
+    A log that can't be opened only disables the log.
+    '''
+    def _enable_timing_log(self):
+        if not Constants.TIMING_LOG: return
+        from src import Timing
+        try:
+            Timing.enable_log(environ_path(Constants.TIMING_LOG))
+        except Exception:
+            pass
+
+
     # ============ session handling ===============
     
 
     def _prelogin(self, session) -> bool:
+        if not session: return False
+        import webuntis
+        from src import SessionManager
         try:
-            if not session: return False
-            self.session = session.login()
+            self.session = SessionManager.SessionManager.from_session(session).login()
             return True
         except webuntis.errors.BadCredentialsError:
             showerror("Login Fehlgeschlagen", message="Eingabedaten sind nicht korrekt.")
@@ -116,19 +156,39 @@ class MainFrame(tk.Tk):
         y = (screen_height-Constants.HEIGHT)/2
 
         self.title('Pausenaufsichten')
-        self.iconphoto(False, tk.PhotoImage(file=resource_path('appIcon.png')))
         self.geometry(f'{Constants.WIDTH}x{Constants.HEIGHT}+{int(x)}+{int(y)}')
 
 
-    def selectDisplayFrame(self, session: webuntis.Session):
+    '''
+    @param index: optional data source instead of the session (see DisplayFrame)
+    '''
+    def selectDisplayFrame(self, session: 'SessionManager.SessionManager', index=None):
+        from src import DisplayFrame
         if hasattr(self, 'content') and self.content: self.content.destroy()
+        self.session = session
         self.configure_variables()
-        self.content = DisplayFrame.DisplayFrame(parent=self, session=session)
+        cache = None if index else self._supervision_cache()
+        self.content = DisplayFrame.DisplayFrame(parent=self, session=session, cache=cache, index=index)
         self.content.grid(row=0, column=0) 
         self.content.pack(anchor=tk.N, fill=tk.BOTH, expand=True, side=tk.LEFT )
 
 
+    '''
+    Opened on first use, a broken cache file only disables the cache.
+    '''
+    def _supervision_cache(self):
+        if self.cache: return self.cache
+        from src import SupervisionCache
+        try:
+            self.cache = SupervisionCache.SupervisionCache(environ_path(Constants.SUPERVISION_CACHE))
+        except Exception:
+            self.cache = None
+        return self.cache
+
+
     def selectLoginFrame(self):
+        self._logout()
+        self.session = None
         self.title('Webuntis Login - Pausenaufsicht')
         if hasattr(self, 'content') and self.content: self.content.destroy()
         self.content = LoginFrame(parent=self)
@@ -144,11 +204,13 @@ class LoginFrame(TKUtils.FillerFrame):
 
     def __init__(self, parent, *args, **kwargs):
         super().__init__(parent, *args, **kwargs)
+        self.worker = TKUtils.TkWorker(self)
         self.adjust_win_size(parent)
         self._build()
         self._substitute_login()
         self._bind_enter()
         self._set_focus()
+        self.worker.submit(lambda token: _preload(), channel="preload")
 
 
     def try_login(self):
@@ -157,21 +219,28 @@ class LoginFrame(TKUtils.FillerFrame):
         pw = self.pw_entry.get()
         school = self.school_entry.get()
         server = self.server_entry.get()
-        Thread(target=lambda:self._login(user, pw, school, server)).start()
+        self.worker.submit(lambda token: self._login(user, pw, school, server),
+                           on_done=lambda session: self._finish_login(session, school, server), on_error=self._login_failed)
 
     
+    '''
+    Runs on the worker thread. The password only stays in the SessionManager's memory for re-logins.
+    '''
     def _login(self, user, pw, school, server):
-        try:
-            session = webuntis.Session(server=server, username=user, password=pw, school=school, useragent=Constants.USER_AGENT)
-            session.login()
-            Thread(target=lambda: self._finish_login(session, school, server)).start()
-        except webuntis.errors.BadCredentialsError:
+        from src import SessionManager, Timing
+        with Timing.trace("login"):
+            return SessionManager.SessionManager(server=server, username=user, password=pw, school=school).login()
+
+
+    def _login_failed(self, error):
+        import webuntis
+        if isinstance(error, webuntis.errors.BadCredentialsError):
             self._report("Zugangsdaten sind nicht korrekt.")
-        except webuntis.errors.AuthError:
+        elif isinstance(error, webuntis.errors.AuthError):
             self._report("Authentifizierung fehlgeschlagen.")
-        except ValueError:
+        elif isinstance(error, ValueError):
             self.submit["state"] = "normal"
-        except Exception:
+        else:
             self._report("Es konnte keine Verbindung aufgebaut werden.")
 
     
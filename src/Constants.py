@@ -5,4 +5,52 @@ BACKGROUND="#93B5E1"
 C_PERIOD="lightblue"
 ITEM_WIDTH=200
 USER_AGENT="Pausenaufsichtenanzeiger"
-CACHE="config.ini"
\ No newline at end of file
+CACHE="config.ini"
+# concurrent requests while loading: threads of the sweep and requests in flight of the RequestScheduler
+FETCH_WORKERS=8
+# sqlite-file next to config.ini, snapshots older than the TTL are dropped
+SUPERVISION_CACHE="supervisions.db"
+SUPERVISION_CACHE_TTL_HOURS=72
+# teachers, rooms and timegrid are fetched again after this time or after a new import on the server
+MASTER_DATA_TTL_MINUTES=60
+# "grid": all supervision columns of a break exist as widgets | "virtual": only the visible columns do
+# "canvas": the whole break is drawn on a single canvas
+TABLE_MODE="grid"
+# unattended displays: next break is shown automatically, data is reloaded between these hours on school days
+AUTO_REFRESH=True
+REFRESH_DAY_HOURS=(6, 17)
+REFRESH_NEAR_BREAK_MINUTES=15
+REFRESH_NEAR_BREAK_SECONDS=120
+REFRESH_LESSON_SECONDS=900
+# while loading, the table shows the supervisions received so far, rebuilt at most every ... ms
+STREAM_INTERVAL_MS=300
+# logged in sessions shared by the fetch workers
+SESSION_POOL_SIZE=1
+# request scheduling of loads: token bucket (requests per second, burst), at most FETCH_WORKERS requests in flight,
+# retries with jittered exponential backoff for connection and server errors
+REQUEST_RATE=10
+REQUEST_BURST=10
+REQUEST_RETRIES=3
+REQUEST_BACKOFF_SECONDS=0.5
+REQUEST_MAX_BACKOFF_SECONDS=8
+# learned roster: only teachers with supervisions in the last days are queried, all teachers once per full-sweep interval
+ROSTER_KEEP_DAYS=28
+ROSTER_FULL_SWEEP_HOURS=24
+# days the school's timegrid (break slots shown before the supervisions are loaded) is kept in the cache
+TIMEGRID_CACHE_DAYS=30
+# days the school calendar (holidays, school years) is kept in the cache
+CALENDAR_CACHE_DAYS=7
+# minutes plain weekdays stand in for a school calendar that couldn't be loaded, before it is requested again
+CALENDAR_RETRY_MINUTES=15
+# FetchDaemon: displays get their data from this address instead of logging in themselves, "" = off
+DAEMON_URL=""
+DAEMON_PORT=8765
+DAEMON_TIMEOUT_SECONDS=120
+DAEMON_REFRESH_SECONDS=60
+# ReplayServer: default port of the offline stand-in for WebUntis
+REPLAY_PORT=8766
+# timing of loads: json lines in .webuntis-breaks ("" = off), rotated at the given size, overlay shows the last load
+TIMING_LOG="timing.log"
+TIMING_LOG_BYTES=1000000
+TIMING_LOG_BACKUPS=3
+TIMING_OVERLAY=False
\ No newline at end of file
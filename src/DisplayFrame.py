@@ -1,26 +1,45 @@
-import idlelib.tooltip
-from threading import Thread
+import logging
+import time
+from functools import cache
 import tkinter as tk
 from datetime import datetime, timedelta
 from tkinter.messagebox import showerror
 
 import webuntis
-from src import UntisBreaks, TKUtils, Constants
+from src import UntisBreaks, TKUtils, Constants, MasterData, RefreshScheduler, RequestScheduler, SessionManager, Timing
 
 
+_logger = logging.getLogger("webuntis-breaks.display")
+
 
 class DisplayFrame(TKUtils.FillerFrame):
     
 
-    def __init__(self, parent, session: webuntis.Session):
+    '''
+    @param cache: optional SupervisionCache for showing the last known state while loading
+    @param index: data source used instead of a SupervisionIndex of the session, e.g. a FetchDaemon.FetchClient
+    '''
+    def __init__(self, parent, session: SessionManager.SessionManager, cache=None, index=None):
         super().__init__(parent)
         self.session = session
+        if index:
+            self.index = index
+        else:
+            requests = RequestScheduler.RequestScheduler()
+            self.master_data = MasterData.MasterData(session, scheduler=requests)
+            self.index = UntisBreaks.SupervisionIndex(session, master=self.master_data, cache=cache, scheduler=requests)
         self.is_today = True
         self.data = None
+        self.skeleton = {}
+        # whether the shown table may be replaced by partial results (empty, skeleton or partial data)
+        self.shows_partial = True
+        self.schedule = UntisBreaks.BreakSchedule([])
         self.currentBreak = None
         # For pretending to have a different day, otherwise should be 0.
         self.natural_offset = 0
         self.break_offset_hours = 0
+        self.scheduler = RefreshScheduler.RefreshScheduler(self) if Constants.AUTO_REFRESH else None
+        self.worker = TKUtils.TkWorker(self)
         self._build()
 
 
@@ -46,38 +65,108 @@ class DisplayFrame(TKUtils.FillerFrame):
         
 
 
-    def _threaded_fail_save(self, callback):
-        try:
-            callback()
-        except Exception as e:
-            TKUtils.TKErrorHandler.report_callback_exception(self, e.__class__.__name__, str(e), e.__traceback__)
-
-
-
     # TODO try-catch connection -> send back to login frame + Error-Popup
     '''
     For the "current" day's table (or whatever the natural_offset suggests).
+    Data sources run on the worker thread and return (data, current_time, failed teachers), they don't touch any widgets.
+    Both are timed as a Timing trace of their name.
+    @param silent: no progress is streamed, the shown table stays until the load is done
     '''
-    def fetch_break_info(self):
-        def do():
-            self.data = UntisBreaks.get_offset_supervisions(self.session, self.natural_offset)
-            current_time = datetime.now()+timedelta(days=self.natural_offset, hours=self.break_offset_hours)
-            self.currentBreak = UntisBreaks.next_break_time(self.data.keys(), current=current_time)
-        self._api_fail_save(do)
+    def fetch_break_info(self, token=None, refresh=False, silent=False):
+        with Timing.trace("fetch_break_info"):
+            day = UntisBreaks.offset_date(self.natural_offset)
+            return self._load_day(token, day, refresh, silent), self._current_time(), self.index.failed_teachers(day)
 
     
-    def fetch_nextday_info(self):
-        def do():
-        # for Mo-Do => Move 1, else move to Monday
-            next_day = self._get_next_day() + self.natural_offset
-            self.data = UntisBreaks.get_offset_supervisions(self.session, next_day)
-            self.currentBreak = UntisBreaks.next_break_time(self.data.keys())
-        self._api_fail_save(do)
+    def fetch_nextday_info(self, token=None, refresh=False, silent=False):
+        with Timing.trace("fetch_nextday_info"):
+            # the next school day: holidays and weekends are skipped once the calendar is loaded
+            with Timing.span("calendar"):
+                self.index.school_calendar()
+            day = UntisBreaks.offset_date(self._get_next_day() + self.natural_offset)
+            return self._load_day(token, day, refresh, silent), None, self.index.failed_teachers(day)
+
+
+    def _load_day(self, token, day, refresh, silent=False):
+        if refresh:
+            with Timing.span("refresh"):
+                self.index.refresh()
+        with Timing.span("break_slots"):
+            self._post_skeleton(token, day)
+        with Timing.span("get_day"):
+            return self.index.get_day(day, on_progress=None if silent else self._stream_progress(token))
+
+
+    '''
+    Progressive loading: shows the supervisions received so far and how many teachers are done,
+    the table is rebuilt at most every Constants.STREAM_INTERVAL_MS. A superseded load stops here.
+    Complete data (a cached snapshot or the last load) is never replaced by the partial results.
+    '''
+    def _stream_progress(self, token):
+        if not token: return None
+        last_update = [0.0]
+        def on_progress(done, total, partial_day):
+            token.check()
+            now = time.monotonic()
+            if done < total and (now - last_update[0])*1000 < Constants.STREAM_INTERVAL_MS: return
+            last_update[0] = now
+            self.worker.post(token, self._show_partial, done, total, partial_day)
+        return on_progress
+
+
+    def _show_partial(self, done, total, partial_day):
+        self._show_progress(done, total)
+        if not partial_day or not self.shows_partial: return
+        current_time = self._current_time() if self.is_today else None
+        # a break picked with the arrows stays selected while more supervisions arrive
+        selected = self.currentBreak
+        self._set_data({**self.skeleton, **partial_day}, current_time)
+        if selected and selected in self.schedule: self.currentBreak = selected
+        self._change_table(self.currentBreak)
+
+
+    '''
+    Break slots from the timegrid, so the arrows and the time header work before the first supervisions arrive.
+    Not needed if the day is already loaded, a failing timegrid request only costs the skeleton.
+    '''
+    def _post_skeleton(self, token, day):
+        if not token or self.index.is_loaded(day): return
+        try:
+            slots = self.index.break_slots(day)
+        except Exception:
+            return
+        if slots: self.worker.post(token, self._show_skeleton, slots)
+
+
+    def _show_skeleton(self, slots):
+        self.skeleton = {slot: [] for slot in slots}
+        if self.table.winfo_manager(): return    # a cached snapshot or partial data is shown already
+        current_time = self._current_time() if self.is_today else None
+        self._set_data(dict(self.skeleton), current_time)
+        self._change_table(self.currentBreak)
+
+
+    def _show_progress(self, done, total):
+        self.progress_label.config(text=f"{done}/{total} Lehrer geladen")
+        self.progress_label.place(relx=0.95, rely=0.55, anchor=tk.E)
+
 
+    def _set_data(self, data, current_time=None):
+        self.data = data
+        self.schedule = UntisBreaks.BreakSchedule(data.keys())
+        self.currentBreak = self.schedule.next(current_time)
 
+
+    def _current_time(self):
+        return datetime.now()+timedelta(days=self.natural_offset, hours=self.break_offset_hours)
+
+
+    '''
+    @return days from the shown day to the next school day (weekends only, as long as the school calendar is not loaded)
+    '''
     def _get_next_day(self):
-        weekday = (datetime.now()+timedelta(days=self.natural_offset)).weekday()
-        return 1 if weekday < 4 else 7-weekday
+        day = UntisBreaks.offset_date(self.natural_offset)
+        return (self.index.next_school_day(day) - day).days
 
 
     # ======== building =======>
@@ -85,7 +174,8 @@ class DisplayFrame(TKUtils.FillerFrame):
 
     def _build(self):
         self.settings_bar = self._create_settings_bar()
-        self.table_frame = self._create_table_frame(forceEmpty=(True, "läd Inhalte.."))
+        self.table_frame = self._create_table_frame()
+        self._change_table(None, _fEmpty=True, _fMessage="läd Inhalte..")
         exit_bar = self._create_exit_bar()
 
         self._pack_contents(self.settings_bar, self.table_frame, exit_bar)
@@ -98,40 +188,92 @@ class DisplayFrame(TKUtils.FillerFrame):
         table_frame.pack(fill=tk.BOTH, expand=True, side=tk.TOP)
 
 
-    def after_init(self, data_source=None):
-        data_source = self._after_init_prep(data_source)
-        def do():
-            try:
-                self._after_init_can_fail(data_source)
-            except webuntis.errors.NotLoggedInError:
-                showerror("Verbindung abgelaufen", message="Sitzung ist abgelaufen. Melden Sie sich erneut an.")
-                self.winfo_toplevel().selectLoginFrame()
-            except RuntimeError as e:
-                try:    # if 'winfo_exists' throws an error, then tk closed => do nothing
-                    if self.winfo_exists():
-                        TKUtils.TKErrorHandler.report_callback_exception(self, e.__class__.__name__, str(e), e.__traceback__)
-                except: pass
-        Thread(target=lambda: self._threaded_fail_save(do)).start()
-
-
-    def _after_init_prep(self, data_source):
+    '''
+    @param data_source: called with a TKUtils.CancelToken on the worker thread, returns (data, current_time, failed teachers)
+    @param silent: unattended reload, the shown day and its label stay and errors are only logged
+    '''
+    def after_init(self, data_source=None, silent=False):
+        if not data_source: self._show_cached_snapshot()
+        data_source = self._after_init_prep(data_source, silent)
+        self.worker.submit(data_source, on_done=self._after_load, on_error=self._silent_load_failed if silent else self._load_failed)
+
+
+    '''
+    Stale-while-revalidate: renders the cached state of the day until the background refresh replaces it.
+    '''
+    def _show_cached_snapshot(self):
+        try:
+            data = self.index.cached_day(UntisBreaks.offset_date(self.natural_offset))
+        except Exception:
+            return
+        if not data: return
+        self.shows_partial = False
+        self._set_data(data, self._current_time())
+        self._change_table(self.currentBreak)
+
+
+    def _after_init_prep(self, data_source, silent=False):
         self.toggle_load_buttons(False)
-        if hasattr(self, 'day_label') and self.day_label: self.day_label.destroy()
+        if not silent and hasattr(self, 'day_label') and self.day_label: self.day_label.destroy()
         return data_source if data_source else self.fetch_break_info
 
 
-    def _after_init_can_fail(self, data_source):
-        try:
-            data_source()
-            self._change_table(self.currentBreak)
-            self.update_day_label()
-            self.toggle_load_buttons(True)
-        except Exception as e: 
-            try:
-                # throws error if frame is destroyed => sucks up error
-                if self.winfo_exists():
-                    raise e
-            except: pass
+    def _after_load(self, result):
+        data, current_time, failed = result
+        self.skeleton = {}
+        self.shows_partial = False
+        self._set_data(data, current_time)
+        self._loaded()
+        self._show_timing()
+        self._show_failed_teachers(failed)
+        self._prefetch_other_day()
+        if self.scheduler: self.scheduler.plan_refresh()
+
+
+    def _loaded(self):
+        self._change_table(self.currentBreak)
+        self.update_day_label()
+        self.toggle_load_buttons(True)
+
+
+    '''
+    Errorhandling for loads, runs on the main loop.
+    '''
+    def _load_failed(self, error):
+        if isinstance(error, webuntis.errors.NotLoggedInError):
+            showerror("Verbindung abgelaufen", message="Sitzung ist abgelaufen. Melden Sie sich erneut an.")
+            return self.winfo_toplevel().selectLoginFrame()
+        if isinstance(error, webuntis.errors.Error):
+            showerror("Server Fehler", message="Ein Fehler während der Kommunikation mit Webuntis ist aufgetreten.")
+            return self.winfo_toplevel().selectLoginFrame()
+        if isinstance(error, OSError):
+            showerror("Verbindung verloren", message="Die Verbindung zum Server wurde verloren.")
+        else:
+            TKUtils.TKErrorHandler.report_callback_exception(self, error.__class__.__name__, str(error), error.__traceback__)
+        self._loaded()
+
+
+    '''
+    Nobody is there to read a dialog on an unattended display: the shown data stays,
+    the RefreshScheduler has already planned the next refresh, which tries again.
+    '''
+    def _silent_load_failed(self, error):
+        _logger.warning("refresh failed: %s: %s", error.__class__.__name__, error)
+        self.toggle_load_buttons(True)
+
+
+
+    '''
+    Loads the day the toggle button switches to in the background, so toggling needs no requests.
+    Errors are ignored here, they are reported once the day is actually requested.
+    The prefetch shares the worker thread with the loads: it checks its token after every teacher,
+    so a reload that cancels it doesn't wait for the whole sweep.
+    '''
+    def _prefetch_other_day(self):
+        offset = self.natural_offset if not self.is_today else self.natural_offset + self._get_next_day()
+        day = UntisBreaks.offset_date(offset)
+        if self.index.is_loaded(day): return
+        self.worker.submit(lambda token: self.index.get_day(day, on_progress=lambda *progress: token.check()), channel="prefetch")
 
 
 
@@ -149,12 +291,17 @@ class DisplayFrame(TKUtils.FillerFrame):
         self.toggle_day.config(font=("Arial", 13), bg=Constants.BACKGROUND, activeforeground="blue", activebackground=Constants.BACKGROUND)
         self.toggle_day.place(relx=0.5, rely=0.55, anchor=tk.CENTER)
         self.toggle_day.config(command=self.toggleDay)
+
+        self.progress_label = tk.Label(settings_bar, font=("Arial", 11), bg=Constants.BACKGROUND, fg="gray25", borderwidth=0)
+        self.failed_label = tk.Label(settings_bar, font=("Arial", 11), bg=Constants.BACKGROUND, fg="#b30000", borderwidth=0)
+        self.failed_tip = _text_tip(self.failed_label, None, hover_delay=300)
         return settings_bar
 
     
     def toggleDay(self):
         self.toggle_load_buttons(False)
         self._change_table(None, _fEmpty=True, _fMessage="aktualisiert Inhalte...")
+        self.shows_partial = True
         self.is_today = not self.is_today
         if self.is_today:
             self.toggle_day.config(text="Nächstes >>")
@@ -163,6 +310,17 @@ class DisplayFrame(TKUtils.FillerFrame):
         self.after_init(data_source=self.fetch_nextday_info)
 
 
+    '''
+    Partial results: names the teachers whose timetables are missing in the shown table.
+    '''
+    def _show_failed_teachers(self, failed):
+        if not failed:
+            return self.failed_label.place_forget()
+        self.failed_label.config(text=f"\u26A0 {len(failed)} Lehrer nicht geladen")
+        self.failed_tip.text = "Nicht geladen:\n" + "\n".join(failed)
+        self.failed_label.place(x=70, rely=0.55, anchor=tk.W)
+
+
     def toggle_load_buttons(self, activate):
         if activate:
             self.retry["state"] = 'normal'
@@ -178,6 +336,7 @@ class DisplayFrame(TKUtils.FillerFrame):
     '''
     def update_day_label(self):
         if hasattr(self, 'day_label') and self.day_label: self.day_label.destroy()
+        self.progress_label.place_forget()
         ref_time = self._get_reference_day()
         self.day_label = TKUtils.DayLabel(self.settings_bar, ref_time, borderwidth=0)
         self.day_label.config(font=("Arial", 13), bg=Constants.BACKGROUND)
@@ -215,36 +374,42 @@ class DisplayFrame(TKUtils.FillerFrame):
             return self.currentBreak
 
 
-    def reload_tables(self):
+    '''
+    @param silent: keeps showing the current table while loading, without progress (used by the RefreshScheduler)
+    '''
+    def reload_tables(self, silent=False):
+        # the refresh outdates the prefetched day, toggling keeps the prefetch since it loads the day toggled to
+        self.worker.cancel("prefetch")
         self.toggle_load_buttons(False)
-        self._change_table(None, _fEmpty=True, _fMessage="aktualisiert Inhalte...")
-        self.update()
+        if not silent:
+            self._change_table(None, _fEmpty=True, _fMessage="aktualisiert Inhalte...")
+            self.shows_partial = True
+            self.update()
         get = self.fetch_break_info if self.is_today else self.fetch_nextday_info
-        self.after_init(data_source=get)
+        self.after_init(data_source=lambda token: get(token, refresh=True, silent=silent), silent=silent)
 
 
     '''
-    param forceEmpty: 2-tuple with [0: create-empty-table] and [1: Text to be displayed on empty frame]
+    The table frame is built once, _change_table only switches between the table and the empty message.
     '''
-    def _create_table_frame(self, forceEmpty=(False, None)):
+    def _create_table_frame(self):
         frame = TKUtils.FillerFrame(self)
-        self._create_arrow(frame, '\u2B9C', -1).pack(anchor=tk.W, fill=tk.Y, side=tk.LEFT)
-        if not forceEmpty[0] and self.is_displayable():
-            self._create_table(frame).pack(anchor=tk.W, fill=tk.BOTH, expand=True, side=tk.LEFT)
-        else:
-            self._create_empty_table(frame, forceEmpty[1]).pack(anchor=tk.W, fill=tk.BOTH, expand=True, side=tk.LEFT)
-        self._create_arrow(frame, "\u2B9E", 1).pack(anchor=tk.W, fill=tk.Y, side=tk.RIGHT)
+        left_frame, self.left_arrow = self._create_arrow(frame, '\u2B9C')
+        left_frame.pack(anchor=tk.W, fill=tk.Y, side=tk.LEFT)
+        right_frame, self.right_arrow = self._create_arrow(frame, "\u2B9E")
+        right_frame.pack(anchor=tk.W, fill=tk.Y, side=tk.RIGHT)
+        self.empty_table = self._create_empty_table(frame)
+        self.table = self._create_table(frame)
         return frame
 
 
-    def _create_arrow(self, parent, text, offset):
+    def _create_arrow(self, parent, text):
         arrow_frame = TKUtils.FillerFrame(parent, width=120)
 
         arrow = tk.Button(arrow_frame, text=text)
         arrow.configure(borderwidth=0, font=("Arial", 30))
-        self._toggle_button(arrow, offset)
         arrow.place(relx=0.5, rely=0.5, anchor=tk.CENTER)
-        return arrow_frame
+        return arrow_frame, arrow
 
 
     '''
@@ -256,7 +421,7 @@ class DisplayFrame(TKUtils.FillerFrame):
         bg=Constants.BACKGROUND
         def do():
             if self.currentBreak:
-                rel_break = UntisBreaks.get_relative_break(self.currentBreak, self.data.keys(), offset)
+                rel_break = self.schedule.relative(self.currentBreak, offset)
             # deactivate if necessary
             if not (self.currentBreak and rel_break):
                 arrow["state"] = "disabled"
@@ -272,23 +437,58 @@ class DisplayFrame(TKUtils.FillerFrame):
     Difference to reload_tables: Not refreshing data, only displaying different breaks.
     '''
     def _change_table(self, selected_break_time, _fEmpty=False, _fMessage=None):
-        self.currentBreak = selected_break_time
-        self.table_frame.destroy()
-        self.table_frame = self._create_table_frame(forceEmpty=(_fEmpty, _fMessage))
-        self.table_frame.pack(fill=tk.BOTH, expand=True, side=tk.TOP)
+        with Timing.trace("change_table"):
+            self.currentBreak = selected_break_time
+            with Timing.span("arrows"):
+                self._toggle_button(self.left_arrow, -1)
+                self._toggle_button(self.right_arrow, 1)
+            if self.scheduler: self.scheduler.plan_advance()
+            if not _fEmpty and self.is_displayable():
+                with Timing.span("fill_table"):
+                    self._fill_table()
+                with Timing.span("show"):
+                    self._show_table_content(self.table)
+                return
+            self.empty_label.config(text=_fMessage if _fMessage else "Hier ist nichts zu sehen :/")
+            self._show_table_content(self.empty_table)
+
+
+    '''
+    Showing the table fires the virtual event <<TableShown>> (used by benchmarks.bench_startup).
+    '''
+    def _show_table_content(self, content):
+        hidden = self.empty_table if content is self.table else self.table
+        hidden.pack_forget()
+        if not content.winfo_manager():
+            content.pack(anchor=tk.W, fill=tk.BOTH, expand=True, side=tk.LEFT)
+        if content is self.table:
+            self.event_generate("<<TableShown>>", when="tail")
+
+
+
+    '''
+    Debug overlay (Constants.TIMING_OVERLAY): phases of the last load and of the last table change, bottom left of the table.
+    '''
+    def _show_timing(self):
+        if not Constants.TIMING_OVERLAY: return
+        traces = [Timing.last(name) for name in ("fetch_break_info" if self.is_today else "fetch_nextday_info", "change_table")]
+        if not hasattr(self, 'timing_label'):
+            self.timing_label = tk.Label(self.table_frame, justify=tk.LEFT, anchor=tk.SW, font=("Courier", 9), bg="#ffffe0")
+        self.timing_label.config(text="\n".join(trace.summary() for trace in traces if trace))
+        self.timing_label.place(relx=0, rely=1, anchor=tk.SW)
+        self.timing_label.lift()
 
 
 
     # ==== empty table ====>
 
 
-    def _create_empty_table(self, parent, message):
-        msg = message if message else "Hier ist nichts zu sehen :/"
+    def _create_empty_table(self, parent):
         empty = tk.Frame(parent, bg=Constants.BACKGROUND)
         empty.pack_propagate(False)
-        label = tk.Label(empty, text=msg, bg=Constants.BACKGROUND)
-        label.configure(font="Helvetica 10 italic")
-        label.place(relx=0.5, rely=0.5, anchor=tk.CENTER)
+        self.empty_label = tk.Label(empty, bg=Constants.BACKGROUND)
+        self.empty_label.configure(font="Helvetica 10 italic")
+        self.empty_label.place(relx=0.5, rely=0.5, anchor=tk.CENTER)
         return empty
 
 
@@ -298,88 +498,86 @@ class DisplayFrame(TKUtils.FillerFrame):
     def _create_table(self, parent):
         table = TKUtils.FillerFrame(parent, bg="blue")
         self._addTime(table)
-        container = TKUtils.WidthControlledScrollContainer(table, Constants.ITEM_WIDTH)
-        container.pack(fill=tk.BOTH, expand=True)
-        self._add_periods_to_grid(container.get_frame())
+        if Constants.TABLE_MODE == "virtual":
+            self.container = TKUtils.VirtualScrollContainer(table, Constants.ITEM_WIDTH, create_item=PeriodColumn,
+                update_item=lambda column, period: column.show(*self._column_content(period)))
+        elif Constants.TABLE_MODE == "canvas":
+            self.container = TKUtils.CanvasTable(table, Constants.ITEM_WIDTH)
+        else:
+            self.container = TKUtils.WidthControlledScrollContainer(table, Constants.ITEM_WIDTH)
+            self.container.get_frame().rowconfigure(0, weight=1)
+        self.container.pack(fill=tk.BOTH, expand=True)
+        self.columns = []
         return table
 
 
-    def _add_periods_to_grid(self, frame: tk.Frame):
-        frame.rowconfigure(0, weight=1)
-        for i, period in enumerate(self.data[self.currentBreak]):
-            frame.columnconfigure(i, weight=1)
+    def _fill_table(self):
+        self.time_label.config(text=self._getTime())
+        periods = self.data[self.currentBreak]
+        if Constants.TABLE_MODE == "virtual":
+            return self.container.set_items(periods)
+        if Constants.TABLE_MODE == "canvas":
+            return self.container.set_columns([self._column_content(period) for period in periods])
+        self._add_periods_to_grid(self.container.get_frame(), periods)
+        self.container.set_item_count(len(periods))
 
-            pFrame = tk.Frame(frame, bg=self.getPeriodBG(period), width=Constants.ITEM_WIDTH, padx=40)
-            pFrame.config(highlightbackground="gray", highlightthickness=1)
-            self.config_tooltip(period, pFrame)
-            pFrame.pack_propagate(False)
-            pFrame.columnconfigure(0, weight=1)
-            pFrame.rowconfigure(0, weight=1)
-            pFrame.rowconfigure(1, weight=1)
 
-            self._add_teachers(pFrame, period)
-            self._add_rooms(pFrame, period)
-            pFrame.grid(row=0, column=i, sticky=tk.NSEW)
+    '''
+    Column widgets are pooled: existing ones only get new texts and colors,
+    new ones are created if a break has more supervisions than the pool holds.
+    '''
+    def _add_periods_to_grid(self, frame: tk.Frame, periods: list):
+        while len(self.columns) < len(periods):
+            self.columns.append(PeriodColumn(frame))
+        for i, column in enumerate(self.columns):
+            if i < len(periods):
+                frame.columnconfigure(i, weight=1)
+                column.show(*self._column_content(periods[i]))
+                column.grid(row=0, column=i, sticky=tk.NSEW)
+            else:
+                frame.columnconfigure(i, weight=0)
+                column.grid_remove()
 
 
-    def config_tooltip(self, period, widget):
-        if period.code == 'cancelled':
-            idlelib.tooltip.Hovertip(widget,'Abgesagte Stunde')
-        if period.code == 'irregular':
-            idlelib.tooltip.Hovertip(widget,'Irreguläre Stunde')
-
+    '''
+    @return background, foreground, teachers-text, rooms-text and tooltip (or None) of a supervision column
+    '''
+    def _column_content(self, period):
+        teachers_text = self._str_teachers(period)[:-2]
+        rooms_text = self._str_rooms(period)[:-2]
+        return self.getPeriodBG(period), self.getPeriodFG(period), teachers_text, rooms_text, self._tooltip_text(period)
 
-    def _add_teachers(self, parent, period):
-        # gray border frame to fill space
-        borderFrame = tk.Frame(parent, bg="gray", width=Constants.ITEM_WIDTH)
-        borderFrame.pack_propagate(False)
-        borderFrame.grid(row=0, column=0, sticky=tk.NSEW)
 
-        # then frame with pad-bottom=1   => showing gray border
-        tFrame = tk.Frame(borderFrame, bg=self.getPeriodBG(period))
-        tFrame.pack(fill=tk.BOTH, expand=True, side=tk.TOP, anchor=tk.NW, pady=(0,1), padx=(0,0))
-        teachers_text = self._str_teachers(period)
-        tLabel = tk.Label(tFrame, text=teachers_text[:-2], font=("Arial", 10))
-        tLabel.config(fg=self.getPeriodFG(period), bg=self.getPeriodBG(period))
-        tLabel.bind('<Configure>', lambda e: tLabel.config(wraplength=tLabel.winfo_width()))
-        tLabel.pack( side=tk.BOTTOM, pady=(10,20))
+    def _tooltip_text(self, period):
+        if period.code == 'cancelled':
+            return 'Abgesagte Stunde'
+        if period.code == 'irregular':
+            return 'Irreguläre Stunde'
+        return None
 
 
-    '''
-        For unknown reasons, an index error is thrown if the list is empty.
-        Printing the period show a teacher as id=0, but no such teachers exists,
-        therefore I can only reckon this is the webuntis way of saying there is no teacher.
-    '''
     def _str_teachers(self, period):
         teachers_text = ""
-        try:
-            for t in period.teachers:
-                teachers_text += t.full_name + "\n" + "\n"
-        except IndexError:
-            pass
-        for t in period.original_teachers:
-            teachers_text += f"({t.full_name})\n\n"
+        for name in period.teachers:
+            teachers_text += name + "\n" + "\n"
+        for name in period.original_teachers:
+            teachers_text += f"({name})\n\n"
         return teachers_text if teachers_text else "----"
 
 
-    def _add_rooms(self, parent, period):
-        rFrame = tk.Frame(parent, bg=self.getPeriodBG(period))
-        rFrame.pack_propagate(False)
-        rFrame.grid(row=1, column=0, sticky=tk.NSEW)
+    def _str_rooms(self, period):
         room_text = ""
-        for r in period.rooms:
-            room_text += r.long_name + "\n" +"\n"
-        for r in period.original_rooms:
-            room_text += f"({r.long_name})\n\n"
-        room_text = room_text if room_text else "----"
-        rLabel = tk.Label(rFrame, text=room_text[:-2], font=("Arial", 10))
-        rLabel.config(bg=self.getPeriodBG(period), fg=self.getPeriodFG(period))
-        rLabel.pack(side=tk.TOP, pady=(20,10))
+        for name in period.rooms:
+            room_text += name + "\n" +"\n"
+        for name in period.original_rooms:
+            room_text += f"({name})\n\n"
+        return room_text if room_text else "----"
 
 
     def _addTime(self, parent):
         upperside = TKUtils.FillerFrame(parent, height=70)
-        tk.Label(upperside, text=self._getTime(), padx=5, pady=5, bg=Constants.BACKGROUND, font=("Courier", 18)).pack(anchor=tk.W)
+        self.time_label = tk.Label(upperside, padx=5, pady=5, bg=Constants.BACKGROUND, font=("Courier", 18))
+        self.time_label.pack(anchor=tk.W)
         upperside.pack(anchor=tk.N, fill=tk.X, expand=False, side=tk.TOP)
 
 
@@ -403,4 +601,73 @@ class DisplayFrame(TKUtils.FillerFrame):
     def getPeriodFG(self, period):
         if period.code=='cancelled':
             return "white"
-        return "black"
\ No newline at end of file
+        return "black"
+
+
+
+'''
+Hovertip whose text can be replaced, without text no tip is shown.
+The class is built with the first tip, so idlelib is not imported before a table is shown.
+'''
+@cache
+def _text_tip_class():
+    from idlelib.tooltip import Hovertip
+    class TextTip(Hovertip):
+        def showtip(self):
+            if self.text: super().showtip()
+    return TextTip
+
+
+def _text_tip(anchor, text, hover_delay=1000):
+    return _text_tip_class()(anchor, text, hover_delay=hover_delay)
+
+
+
+'''
+One supervision column of the table: teachers on top, rooms below.
+Created once and reused for other supervisions via show().
+'''
+class PeriodColumn(tk.Frame):
+
+
+    def __init__(self, parent):
+        super().__init__(parent, width=Constants.ITEM_WIDTH, padx=40)
+        self.config(highlightbackground="gray", highlightthickness=1)
+        self.pack_propagate(False)
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+        self.rowconfigure(1, weight=1)
+        self.tooltip = _text_tip(self, None)
+        self._build_teachers()
+        self._build_rooms()
+
+
+    def _build_teachers(self):
+        # gray border frame to fill space
+        borderFrame = tk.Frame(self, bg="gray", width=Constants.ITEM_WIDTH)
+        borderFrame.pack_propagate(False)
+        borderFrame.grid(row=0, column=0, sticky=tk.NSEW)
+
+        # then frame with pad-bottom=1   => showing gray border
+        self.tFrame = tk.Frame(borderFrame)
+        self.tFrame.pack(fill=tk.BOTH, expand=True, side=tk.TOP, anchor=tk.NW, pady=(0,1), padx=(0,0))
+        self.tLabel = tk.Label(self.tFrame, font=("Arial", 10))
+        self.tLabel.bind('<Configure>', lambda e: self.tLabel.config(wraplength=self.tLabel.winfo_width()))
+        self.tLabel.pack( side=tk.BOTTOM, pady=(10,20))
+
+
+    def _build_rooms(self):
+        self.rFrame = tk.Frame(self)
+        self.rFrame.pack_propagate(False)
+        self.rFrame.grid(row=1, column=0, sticky=tk.NSEW)
+        self.rLabel = tk.Label(self.rFrame, font=("Arial", 10))
+        self.rLabel.pack(side=tk.TOP, pady=(20,10))
+
+
+    def show(self, bg, fg, teachers_text, rooms_text, tooltip):
+        self.config(bg=bg)
+        self.tFrame.config(bg=bg)
+        self.rFrame.config(bg=bg)
+        self.tLabel.config(text=teachers_text, fg=fg, bg=bg)
+        self.rLabel.config(text=rooms_text, fg=fg, bg=bg)
+        self.tooltip.text = tooltip
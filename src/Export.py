@@ -0,0 +1,127 @@
+'''
+Headless export of break supervisions, no tkinter involved (for signage systems, cron jobs, ...).
+Run from the project folder:
+    python -m src.Export --server SERVER --school SCHOOL --username USER [--start 2024-01-08] [--days 5] [--format csv] [--output FILE]
+The password is read from the environment variable WEBUNTIS_PASSWORD or asked for on the terminal.
+'''
+import argparse
+import csv
+import json
+import os
+import sys
+from datetime import date, timedelta
+from getpass import getpass
+
+import webuntis
+from src import Constants, UntisBreaks, SessionManager, SupervisionCache
+
+
+FIELDS = ("day", "start", "end", "code", "teachers", "original_teachers", "rooms", "original_rooms", "id")
+
+
+'''
+@return flat dict of one supervision, names are joined by ", " for csv and kept as lists for ndjson
+'''
+def _record(supervision: UntisBreaks.Supervision, join_names: bool) -> dict:
+    names = (lambda n: ", ".join(n)) if join_names else list
+    return {
+        "day": supervision.start.date().isoformat(), "start": supervision.start.isoformat(), "end": supervision.end.isoformat(),
+        "code": supervision.code, "teachers": names(supervision.teachers), "original_teachers": names(supervision.original_teachers),
+        "rooms": names(supervision.rooms), "original_rooms": names(supervision.original_rooms), "id": supervision.id,
+    }
+
+
+'''
+Writes one record per supervision, sorted by break start. Each day is flushed as soon as it is loaded.
+'''
+class _Writer:
+
+
+    def __init__(self, stream, format: str):
+        self.stream = stream
+        self.format = format
+        if format == "csv":
+            self._csv = csv.DictWriter(stream, fieldnames=FIELDS)
+            self._csv.writeheader()
+
+
+    def write_day(self, data: dict):
+        for start in sorted(data):
+            for supervision in data[start]:
+                if self.format == "csv":
+                    self._csv.writerow(_record(supervision, join_names=True))
+                else:
+                    self.stream.write(json.dumps(_record(supervision, join_names=False), ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+
+'''
+Login options shared by the command line entry points, each one falls back to an environment variable.
+'''
+def add_login_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--server", default=os.environ.get("WEBUNTIS_SERVER"), help="e.g. herakles.webuntis.com (WEBUNTIS_SERVER)")
+    parser.add_argument("--school", default=os.environ.get("WEBUNTIS_SCHOOL"), help="(WEBUNTIS_SCHOOL)")
+    parser.add_argument("--username", default=os.environ.get("WEBUNTIS_USERNAME"), help="(WEBUNTIS_USERNAME)")
+
+
+def check_login_arguments(parser: argparse.ArgumentParser, args):
+    for required in ("server", "school", "username"):
+        if not getattr(args, required):
+            parser.error(f"--{required} is required")
+
+
+'''
+@return logged in SessionManager, or None after printing the reason to stderr
+'''
+def login(args) -> SessionManager.SessionManager:
+    password = os.environ.get("WEBUNTIS_PASSWORD") or getpass("Password: ")
+    try:
+        return SessionManager.SessionManager(args.server, args.username, password, args.school).login()
+    except (webuntis.errors.Error, OSError) as e:
+        print(f"login failed: {e.__class__.__name__}: {e}", file=sys.stderr)
+        return None
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m src.Export", description="Exports break supervisions from WebUntis.")
+    add_login_arguments(parser)
+    parser.add_argument("--start", type=date.fromisoformat, default=date.today(), help="first day as YYYY-MM-DD, default: today")
+    parser.add_argument("--days", type=int, default=1, help="number of days from --start on, default: 1")
+    parser.add_argument("--format", choices=("ndjson", "csv"), default="ndjson")
+    parser.add_argument("--output", help="file to write to, default: stdout")
+    parser.add_argument("--cache", help="SupervisionCache file shared between runs (roster, timegrid, calendar)")
+    parser.add_argument("--workers", type=int, default=Constants.FETCH_WORKERS)
+    args = parser.parse_args(argv)
+    check_login_arguments(parser, args)
+    return args
+
+
+'''
+@return exit code: 0 on success, 1 if the export failed, 2 if the login failed
+'''
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    session = login(args)
+    if not session:
+        return 2
+    cache = SupervisionCache.SupervisionCache(args.cache) if args.cache else None
+    index = UntisBreaks.SupervisionIndex(session, args.workers, cache=cache)
+    stream = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        writer = _Writer(stream, args.format)
+        for offset in range(args.days):
+            day = args.start + timedelta(days=offset)
+            writer.write_day(index.get_day(day))
+            failed = index.failed_teachers(day)
+            if failed: print(f"{day}: incomplete, failed teachers: {', '.join(failed)}", file=sys.stderr)
+        return 0
+    except (webuntis.errors.Error, OSError) as e:
+        print(f"export failed: {e.__class__.__name__}: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if stream is not sys.stdout: stream.close()
+        session.logout(suppress_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
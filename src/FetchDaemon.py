@@ -0,0 +1,214 @@
+'''
+Local fetch service for several displays: one session, one SupervisionIndex and one cache serve all screens,
+so ten displays cost the WebUntis server as much as one. Displays connect with a FetchClient.
+Run from the project folder:
+    python -m src.FetchDaemon --server SERVER --school SCHOOL --username USER [--port 8765] [--cache FILE]
+and start the displays with src.Launcher.launch(daemon_url="http://127.0.0.1:8765") (or set Constants.DAEMON_URL).
+
+API (json):
+    GET  /day/YYYY-MM-DD          {"day", "supervisions", "failed"}, loads the week if necessary
+    GET  /break-slots/YYYY-MM-DD  break starts from the timegrid
+    GET  /calendar                holidays and school years (SchoolCalendar.to_json)
+    POST /refresh                 {"changed"}, at most once per DAEMON_REFRESH_SECONDS for all clients together
+'''
+import argparse
+import datetime
+import json
+import sys
+import time
+import urllib.request
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from threading import Lock
+
+import webuntis
+from src import Constants, UntisBreaks, SupervisionCache, SchoolCalendar, Export
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+
+    def do_GET(self):
+        parts = self.path.strip("/").split("/")
+        index = self.server.index
+        try:
+            if parts[0] == "day" and len(parts) == 2:
+                day = datetime.date.fromisoformat(parts[1])
+                data = index.get_day(day)
+                return self._send(200, {"day": day.isoformat(), "supervisions": SupervisionCache.serialize_day(data),
+                                        "failed": index.failed_teachers(day)})
+            if parts[0] == "break-slots" and len(parts) == 2:
+                slots = index.break_slots(datetime.date.fromisoformat(parts[1]))
+                return self._send(200, [slot.isoformat() for slot in slots])
+            if parts == ["calendar"]:
+                return self._send(200, index.school_calendar().to_json())
+            self._send(404, {"error": "not found"})
+        except Exception as e:
+            self._send_error(e)
+
+
+    def do_POST(self):
+        if self.path.strip("/") != "refresh":
+            return self._send(404, {"error": "not found"})
+        try:
+            self._send(200, {"changed": self.server.refresh()})
+        except Exception as e:
+            self._send_error(e)
+
+
+    '''
+    The daemon keeps running whatever goes wrong, the display reports the failed load.
+    '''
+    def _send_error(self, error: Exception):
+        if isinstance(error, ValueError):
+            status = 400
+        elif isinstance(error, (webuntis.errors.Error, OSError)):
+            status = 502
+        else:
+            status = 500
+            self.log_error("%s: %s", error.__class__.__name__, error)
+        self._send(status, {"error": error.__class__.__name__, "message": str(error)})
+
+
+    def _send(self, status: int, body):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+    def log_message(self, format, *args):
+        if self.server.verbose: super().log_message(format, *args)
+
+
+
+'''
+HTTP server around one SupervisionIndex. Requests are handled on their own threads,
+clients asking for the same week while it loads wait for that one sweep.
+'''
+class FetchDaemon(ThreadingHTTPServer):
+
+    daemon_threads = True
+
+
+    def __init__(self, address: tuple, index: UntisBreaks.SupervisionIndex, verbose: bool=False):
+        super().__init__(address, _Handler)
+        self.index = index
+        self.verbose = verbose
+        self._last_refresh = 0.0
+        self._refresh_lock = Lock()
+
+
+    '''
+    Every display refreshes on its own timer, the daemon only asks the server once per DAEMON_REFRESH_SECONDS.
+    '''
+    def refresh(self) -> bool:
+        with self._refresh_lock:
+            if time.monotonic() - self._last_refresh < Constants.DAEMON_REFRESH_SECONDS:
+                return False
+            changed = self.index.refresh()
+            self._last_refresh = time.monotonic()
+            return changed
+
+
+
+'''
+Data source for a DisplayFrame that asks a FetchDaemon instead of WebUntis,
+offers the methods of UntisBreaks.SupervisionIndex used by the display.
+Connection problems and errors of the daemon are raised as OSError (urllib.error.URLError).
+'''
+class FetchClient:
+
+
+    def __init__(self, url: str, timeout: float=Constants.DAEMON_TIMEOUT_SECONDS):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self._days = {}
+        self._failed = {}
+        self._calendar = None
+
+
+    '''
+    @param on_progress: not supported, the daemon answers once the week is loaded
+    '''
+    def get_day(self, day: datetime.date, on_progress=None) -> dict:
+        if day not in self._days:
+            body = self._request("GET", f"/day/{day.isoformat()}")
+            self._failed[day] = body["failed"]
+            self._days[day] = SupervisionCache.deserialize_day(body["supervisions"])
+        return self._days[day]
+
+
+    def cached_day(self, day: datetime.date) -> dict:
+        return self._days.get(day)
+
+
+    def is_loaded(self, day: datetime.date) -> bool:
+        return day in self._days
+
+
+    def failed_teachers(self, day: datetime.date) -> list:
+        return self._failed.get(day, [])
+
+
+    '''
+    Forgets the received days, the daemon answers the next lookups from its own memory unless the data changed.
+    '''
+    def refresh(self) -> bool:
+        changed = self._request("POST", "/refresh")["changed"]
+        self._days.clear()
+        self._failed.clear()
+        return changed
+
+
+    def break_slots(self, day: datetime.date) -> list:
+        return [datetime.datetime.fromisoformat(slot) for slot in self._request("GET", f"/break-slots/{day.isoformat()}")]
+
+
+    def school_calendar(self) -> SchoolCalendar.SchoolCalendar:
+        if self._calendar is None:
+            self._calendar = SchoolCalendar.SchoolCalendar.from_json(self._request("GET", "/calendar"))
+        return self._calendar
+
+
+    def next_school_day(self, day: datetime.date) -> datetime.date:
+        if self._calendar is None:
+            return SchoolCalendar.next_weekday(day)
+        return self._calendar.next_school_day(day)
+
+
+    def _request(self, method: str, path: str):
+        request = urllib.request.Request(self.url + path, method=method)
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read().decode("utf-8"))
+
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.FetchDaemon", description="Serves break supervisions to several displays.")
+    Export.add_login_arguments(parser)
+    parser.add_argument("--host", default="127.0.0.1", help="use 0.0.0.0 to serve other computers, default: 127.0.0.1")
+    parser.add_argument("--port", type=int, default=Constants.DAEMON_PORT)
+    parser.add_argument("--cache", help="SupervisionCache file, keeps the data over restarts")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+    Export.check_login_arguments(parser, args)
+    session = Export.login(args)
+    if not session:
+        return 2
+    cache = SupervisionCache.SupervisionCache(args.cache) if args.cache else None
+    server = FetchDaemon((args.host, args.port), UntisBreaks.SupervisionIndex(session, cache=cache), args.verbose)
+    print(f"serving on http://{args.host}:{server.server_address[1]}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        session.logout(suppress_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
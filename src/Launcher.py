@@ -1,11 +1,15 @@
-import webuntis
-import src.Application as App
 import src.TKUtils as tku
+from src import Constants
 
 
-def launch(session: webuntis.Session=None):
+'''
+@param session: optional webuntis.Session to skip the login window
+@param daemon_url: optional address of a FetchDaemon (e.g. "http://127.0.0.1:8765") to get the data from, no login needed
+'''
+def launch(session=None, daemon_url: str=Constants.DAEMON_URL):
     try:
+        import src.Application as App
         root = App.MainFrame()
-        root.mainloop(session=session)
+        root.mainloop(session=session, daemon_url=daemon_url)
     except Exception as e:
         tku.TKErrorHandler.report_callback_exception(None, e.__class__.__name__, str(e), e.__traceback__)
\ No newline at end of file
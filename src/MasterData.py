@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+from threading import Lock
+
+import webuntis
+from src import Constants
+
+
+'''
+Teachers, rooms and timegrid of one session, fetched once and then shared by UntisBreaks and the DisplayFrame.
+Entries are fetched again after 'ttl' or as soon as the server reports a new import (see check_import_time).
+With a RequestScheduler every request is rate limited and retried like the timetables of a sweep.
+'''
+class MasterData:
+
+
+    def __init__(self, session: webuntis.Session, ttl: timedelta=timedelta(minutes=Constants.MASTER_DATA_TTL_MINUTES), scheduler=None):
+        self.session = session
+        self.ttl = ttl
+        self.scheduler = scheduler
+        self._entries = {}
+        self._import_time = None
+        self._lock = Lock()
+
+
+    def teachers(self):
+        return self._get('teachers', self.session.teachers)
+
+
+    def rooms(self):
+        return self._get('rooms', self.session.rooms)
+
+
+    def timegrid(self):
+        return self._get('timegrid', self.session.timegrid_units)
+
+
+    '''
+    What the names of supervisions are resolved with (see UntisBreaks.Supervision.from_period).
+    Leaving it to period.teachers and period.rooms costs requests: webuntis keeps only 20 results in its session cache
+    and every timetable takes one, so teachers and rooms would be fetched again every few teachers.
+    @return ({teacher id: full name}, {room id: long name})
+    '''
+    def names(self) -> tuple:
+        return {t.id: t.full_name for t in self.teachers()}, {r.id: r.long_name for r in self.rooms()}
+
+
+    '''
+    Asks the server for its last import, all entries are dropped if it changed since the last check.
+    @return True if the import time changed (the very first check counts as unchanged)
+    '''
+    def check_import_time(self) -> bool:
+        stamp = self._run(self.session.last_import_time).date
+        with self._lock:
+            changed = self._import_time is not None and stamp != self._import_time
+            self._import_time = stamp
+            if changed: self._entries.clear()
+        return changed
+
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+
+    def _get(self, name, fetch):
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry and datetime.now() - entry[0] < self.ttl:
+                return entry[1]
+        value = self._run(fetch)
+        with self._lock:
+            self._entries[name] = (datetime.now(), value)
+        return value
+
+
+    def _run(self, fetch):
+        return self.scheduler.run(fetch) if self.scheduler else fetch()
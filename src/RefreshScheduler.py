@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+
+from src import Constants
+
+
+def _day_start(day: datetime) -> datetime:
+    return day.replace(hour=Constants.REFRESH_DAY_HOURS[0], minute=0, second=0, microsecond=0)
+
+
+def _day_end(day: datetime) -> datetime:
+    return day.replace(hour=Constants.REFRESH_DAY_HOURS[1], minute=0, second=0, microsecond=0)
+
+
+'''
+@return the start of the next school hours after 'now' (weekends are skipped)
+'''
+def _next_day_start(now: datetime) -> datetime:
+    day = _day_start(now)
+    if day <= now:
+        day += timedelta(days=1)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return day
+
+
+'''
+Adaptive plan for unattended displays: refreshes often shortly before a break, rarely during lessons,
+never at night or on weekends (then the next refresh is the next morning of a school day).
+@param schedule: UntisBreaks.BreakSchedule of the shown day
+@return seconds until the next network refresh should happen
+'''
+def next_refresh_delay(now: datetime, schedule) -> float:
+    if now.weekday() >= 5 or not _day_start(now) <= now < _day_end(now):
+        return (_next_day_start(now) - now).total_seconds()
+    near_break = timedelta(minutes=Constants.REFRESH_NEAR_BREAK_MINUTES)
+    upcoming = schedule.next(now)
+    if not upcoming or upcoming <= now:
+        return Constants.REFRESH_LESSON_SECONDS
+    until_near = (upcoming - near_break - now).total_seconds()
+    if until_near <= 0:
+        return Constants.REFRESH_NEAR_BREAK_SECONDS
+    return min(Constants.REFRESH_LESSON_SECONDS, until_near)
+
+
+
+'''
+Keeps a DisplayFrame up to date without clicks, all timers run on Tk's after().
+- advancing: once the start of the shown break passes, the next break is shown (local data only)
+- refreshing: reloads the data in the rhythm of next_refresh_delay
+Both go by the display's clock (_current_time), which can be shifted for testing.
+'''
+class RefreshScheduler:
+
+
+    def __init__(self, display):
+        self.display = display
+        self._advance_job = None
+        self._refresh_job = None
+
+
+    '''
+    Called whenever the shown break changes. Only today's table advances on its own.
+    '''
+    def plan_advance(self):
+        if self._advance_job: self.display.after_cancel(self._advance_job)
+        self._advance_job = None
+        shown = self.display.currentBreak
+        if not (self.display.is_today and shown): return
+        delay = (shown - self.display._current_time()).total_seconds()
+        if delay < 0: return
+        self._advance_job = self.display.after(int(delay*1000) + 1000, self._advance)
+
+
+    def plan_refresh(self):
+        if self._refresh_job: self.display.after_cancel(self._refresh_job)
+        delay = next_refresh_delay(self.display._current_time(), self.display.schedule)
+        self._refresh_job = self.display.after(int(delay*1000), self._refresh)
+
+
+    def _advance(self):
+        self._advance_job = None
+        if not self._alive(): return
+        upcoming = self.display.schedule.next(self.display._current_time())
+        if upcoming and upcoming > self.display.currentBreak:
+            self.display._change_table(upcoming)
+
+
+    '''
+    Skipped while a load is running (buttons disabled), the next refresh is planned either way.
+    '''
+    def _refresh(self):
+        self._refresh_job = None
+        if not self._alive(): return
+        if str(self.display.retry["state"]) == "normal":
+            self.display.reload_tables(silent=True)
+        self.plan_refresh()
+
+
+    def _alive(self) -> bool:
+        try:
+            return bool(self.display.winfo_exists())
+        except Exception:
+            return False
@@ -0,0 +1,275 @@
+'''
+Offline stand-in for WebUntis: records the JSON-RPC traffic of a real session and serves it back.
+Enter the address (e.g. "http://127.0.0.1:8766") into the server field of the login window or pass it as
+webuntis.Session(server=...), then the app talks to this server instead of WebUntis.
+Run from the project folder:
+    python -m src.ReplayServer record --upstream https://herakles.webuntis.com --output school.json
+    python -m src.ReplayServer replay school.json [--latency 80] [--jitter 40] [--error-rate 0.05] [--expire-after 200]
+
+Passwords are never recorded: of the login (authenticate) only the answer is kept, with a made-up session id.
+Replays accept any credentials. Timetable requests without a recording are answered with an empty timetable,
+other unknown requests with a JSON-RPC error. With --shift-dates the recording is moved by whole weeks to the
+current week, so it shows up as today's data.
+'''
+import argparse
+import datetime
+import json
+import random
+import sys
+import time
+import urllib.request
+import uuid
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from threading import Lock
+
+from src import Constants
+
+
+NOT_AUTHENTICATED = -8520       # webuntis.errors.NotLoggedInError
+METHOD_NOT_FOUND = -32601       # webuntis.errors.MethodNotFoundError
+INJECTED_ERROR = -32000         # webuntis.errors.RemoteError
+DATE_FIELDS = ("date", "startDate", "endDate")
+
+
+'''
+@return canonical key of a request, params with dates moved by 'days'
+'''
+def _key(method: str, params, days: int=0) -> str:
+    return method + " " + json.dumps(shift_dates(params, days), sort_keys=True)
+
+
+'''
+Moves every untis date (int YYYYMMDD under "date", "startDate" or "endDate") in a json value by 'days'.
+'''
+def shift_dates(value, days: int):
+    if not days:
+        return value
+    if isinstance(value, list):
+        return [shift_dates(v, days) for v in value]
+    if not isinstance(value, dict):
+        return value
+    shifted = {}
+    for key, v in value.items():
+        if key in DATE_FIELDS and isinstance(v, int):
+            day = datetime.datetime.strptime(str(v), "%Y%m%d").date() + datetime.timedelta(days=days)
+            shifted[key] = int(day.strftime("%Y%m%d"))
+        else:
+            shifted[key] = shift_dates(v, days)
+    return shifted
+
+
+def load_recording(path: str) -> dict:
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_recording(path: str, recording: dict):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(recording, file, ensure_ascii=False)
+
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.server.handle_rpc(self, self.rfile.read(length))
+
+
+    def send_json(self, body: dict, headers=()):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+    def log_message(self, format, *args):
+        if self.server.verbose: super().log_message(format, *args)
+
+
+
+class _RpcServer(ThreadingHTTPServer):
+
+    daemon_threads = True
+
+
+    def __init__(self, address: tuple, verbose: bool):
+        super().__init__(address, _Handler)
+        self.verbose = verbose
+
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+
+
+'''
+Serves a recording like WebUntis would: answers by method and params, knows logged in sessions,
+and can make things worse on purpose:
+@param latency, jitter: seconds every answer waits, latency + uniform(0, jitter)
+@param error_rate: share of requests answered with a JSON-RPC error (RemoteError in webuntis)
+@param drop_rate: share of requests whose connection is closed without an answer (OSError in webuntis)
+@param expire_after: a session expires after this many requests (NotLoggedInError), 0 = never
+@param shift_dates: moves the recording by whole weeks to the current week
+'''
+class ReplayServer(_RpcServer):
+
+
+    def __init__(self, address: tuple, recording: dict, latency: float=0, jitter: float=0, error_rate: float=0,
+                 drop_rate: float=0, expire_after: int=0, shift_dates: bool=False, verbose: bool=False):
+        super().__init__(address, verbose)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.expire_after = expire_after
+        self.days = self._shift(recording) if shift_dates else 0
+        self._answers = {_key(call["method"], call.get("params")): call for call in recording["calls"]}
+        self._login = recording.get("login", {})
+        self._sessions = {}
+        self._lock = Lock()
+
+
+    def _shift(self, recording: dict) -> int:
+        recorded = datetime.date.fromisoformat(recording["recorded_on"])
+        return (datetime.date.today() - recorded).days // 7 * 7
+
+
+    def handle_rpc(self, handler: _Handler, body: bytes):
+        time.sleep(self.latency + random.uniform(0, self.jitter))
+        if random.random() < self.drop_rate:
+            handler.close_connection = True
+            return
+        request = json.loads(body)
+        answer = self._answer(request, handler.headers.get("Cookie", ""))
+        headers = answer.pop("_headers", ())
+        handler.send_json({"jsonrpc": "2.0", "id": request.get("id"), **answer}, headers)
+
+
+    def _answer(self, request: dict, cookie: str) -> dict:
+        method = request.get("method")
+        if method == "authenticate":
+            session_id = uuid.uuid4().hex
+            with self._lock:
+                self._sessions[session_id] = 0
+            return {"result": {**self._login, "sessionId": session_id}, "_headers": [("Set-Cookie", f"JSESSIONID={session_id}; Path=/")]}
+        session_id = _cookie_session(cookie)
+        with self._lock:
+            if session_id not in self._sessions:
+                return _error(NOT_AUTHENTICATED, "not authenticated")
+            if method == "logout":
+                del self._sessions[session_id]
+                return {"result": None}
+            self._sessions[session_id] += 1
+            if self.expire_after and self._sessions[session_id] > self.expire_after:
+                del self._sessions[session_id]
+                return _error(NOT_AUTHENTICATED, "not authenticated")
+        if random.random() < self.error_rate:
+            return _error(INJECTED_ERROR, "injected error")
+        call = self._answers.get(_key(method, request.get("params"), -self.days))
+        if call is None:
+            if method == "getTimetable": return {"result": []}
+            return _error(METHOD_NOT_FOUND, f"no recording for {method}")
+        if "error" in call:
+            return {"error": call["error"]}
+        return {"result": shift_dates(call["result"], self.days)}
+
+
+
+def _cookie_session(cookie: str) -> str:
+    for part in cookie.split(";"):
+        name, _, value = part.strip().partition("=")
+        if name == "JSESSIONID": return value
+    return None
+
+
+def _error(code: int, message: str) -> dict:
+    return {"error": {"code": code, "message": message}}
+
+
+
+'''
+Proxy between the app and WebUntis that writes every answer into a recording (see save_recording).
+'''
+class RecordingProxy(_RpcServer):
+
+
+    def __init__(self, address: tuple, upstream: str, verbose: bool=False):
+        super().__init__(address, verbose)
+        self.upstream = upstream.rstrip("/")
+        self.recording = {"recorded_on": datetime.date.today().isoformat(), "login": {}, "calls": []}
+        self._lock = Lock()
+
+
+    def handle_rpc(self, handler: _Handler, body: bytes):
+        headers = {name: handler.headers[name] for name in ("Content-Type", "Cookie", "User-Agent") if handler.headers.get(name)}
+        request = urllib.request.Request(self.upstream + handler.path, data=body, headers=headers, method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                answer = json.loads(response.read().decode("utf-8"))
+                cookies = [("Set-Cookie", value) for value in response.headers.get_all("Set-Cookie") or []]
+        except OSError as e:
+            return handler.send_error(502, str(e))
+        self._record(json.loads(body), answer)
+        handler.send_json(answer, cookies)
+
+
+    def _record(self, request: dict, answer: dict):
+        method = request.get("method")
+        with self._lock:
+            if method == "authenticate":
+                # the params hold the password, only the answer is kept
+                self.recording["login"] = {k: v for k, v in answer.get("result", {}).items() if k != "sessionId"}
+            elif method != "logout":
+                call = {"method": method, "params": request.get("params")}
+                call.update({"error": answer["error"]} if "error" in answer else {"result": answer.get("result")})
+                self.recording["calls"].append(call)
+
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.ReplayServer", description="Records and replays WebUntis traffic.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=Constants.REPLAY_PORT)
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="forward to WebUntis and record")
+    record.add_argument("--upstream", required=True, help="e.g. https://herakles.webuntis.com")
+    record.add_argument("--output", required=True, help="file the recording is written to on exit (Ctrl+C)")
+    replay = commands.add_parser("replay", help="serve a recording")
+    replay.add_argument("recording")
+    replay.add_argument("--latency", type=float, default=0, help="ms per answer")
+    replay.add_argument("--jitter", type=float, default=0, help="up to this many ms on top of --latency")
+    replay.add_argument("--error-rate", type=float, default=0, help="share of answers that are errors, e.g. 0.05")
+    replay.add_argument("--drop-rate", type=float, default=0, help="share of connections closed without answer")
+    replay.add_argument("--expire-after", type=int, default=0, help="requests until a session expires, 0 = never")
+    replay.add_argument("--shift-dates", action="store_true", help="move the recording to the current week")
+    args = parser.parse_args(argv)
+
+    address = (args.host, args.port)
+    if args.command == "record":
+        server = RecordingProxy(address, args.upstream, args.verbose)
+    else:
+        server = ReplayServer(address, load_recording(args.recording), args.latency / 1000, args.jitter / 1000,
+                              args.error_rate, args.drop_rate, args.expire_after, args.shift_dates, args.verbose)
+    print(f"{args.command}: enter http://{args.host}:{server.server_address[1]} as server", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.command == "record":
+            save_recording(args.output, server.recording)
+            print(f"{len(server.recording['calls'])} calls written to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+import random
+import time
+from threading import Lock, BoundedSemaphore
+
+import webuntis
+from src import Constants
+
+
+'''
+Token bucket: allows 'burst' requests at once and 'rate' requests per second on average.
+'''
+class TokenBucket:
+
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._stamp = time.monotonic()
+        self._lock = Lock()
+
+
+    '''
+    Blocks until a token is available.
+    '''
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+
+'''
+Connection problems and server errors are worth another try. Rejected logins, unknown methods
+and date ranges the server doesn't allow fail the same way every time.
+'''
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, (webuntis.errors.AuthError, webuntis.errors.MethodNotFoundError, webuntis.errors.DateNotAllowed)):
+        return False
+    # webuntis.errors.RemoteError is an OSError as well
+    return isinstance(error, OSError)
+
+
+
+'''
+Keeps the loads polite towards the school's server: every request waits for the token bucket,
+at most 'max_concurrency' requests are in flight, and retryable failures are repeated up to 'retries' times
+with exponential backoff and full jitter (a random wait between 0 and backoff * 2^attempt, capped at max_backoff).
+Safe to share between threads.
+'''
+class RequestScheduler:
+
+
+    def __init__(self, rate: float=Constants.REQUEST_RATE, burst: int=Constants.REQUEST_BURST,
+                 max_concurrency: int=Constants.FETCH_WORKERS, retries: int=Constants.REQUEST_RETRIES,
+                 backoff: float=Constants.REQUEST_BACKOFF_SECONDS, max_backoff: float=Constants.REQUEST_MAX_BACKOFF_SECONDS):
+        self.bucket = TokenBucket(rate, burst)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._slots = BoundedSemaphore(max(1, max_concurrency))
+
+
+    '''
+    @return fn(*args), raises the last error once all retries are used up
+    '''
+    def run(self, fn, *args):
+        attempt = 0
+        while True:
+            try:
+                with self._slots:
+                    self.bucket.acquire()
+                    return fn(*args)
+            except Exception as e:
+                if attempt >= self.retries or not is_retryable(e):
+                    raise
+            time.sleep(self._backoff_delay(attempt))
+            attempt += 1
+
+
+    def _backoff_delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
@@ -0,0 +1,80 @@
+from datetime import date, datetime, timedelta
+
+import webuntis
+
+
+def _as_date(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+
+'''
+School days of a school: weekdays within a school year that are not part of a holiday.
+Built from session.holidays() and session.schoolyears() once and then persisted as json (see to_json),
+without known school years every weekday outside the holidays counts as a school day.
+'''
+class SchoolCalendar:
+
+
+    '''
+    @param holidays: (first day, last day, name) of every holiday
+    @param schoolyears: (first day, last day) of every school year
+    '''
+    def __init__(self, holidays: list, schoolyears: list):
+        self.holidays = sorted(holidays)
+        self.schoolyears = sorted(schoolyears)
+
+
+    @classmethod
+    def from_session(cls, session: webuntis.Session) -> 'SchoolCalendar':
+        holidays = [(_as_date(h.start), _as_date(h.end), h.name) for h in session.holidays()]
+        schoolyears = [(_as_date(y.start), _as_date(y.end)) for y in session.schoolyears()]
+        return cls(holidays, schoolyears)
+
+
+    def to_json(self) -> dict:
+        return {"holidays": [[start.isoformat(), end.isoformat(), name] for start, end, name in self.holidays],
+                "schoolyears": [[start.isoformat(), end.isoformat()] for start, end in self.schoolyears]}
+
+
+    @classmethod
+    def from_json(cls, entry: dict) -> 'SchoolCalendar':
+        holidays = [(date.fromisoformat(start), date.fromisoformat(end), name) for start, end, name in entry["holidays"]]
+        schoolyears = [(date.fromisoformat(start), date.fromisoformat(end)) for start, end in entry["schoolyears"]]
+        return cls(holidays, schoolyears)
+
+
+    '''
+    @return name of the holiday that day belongs to, or None
+    '''
+    def holiday(self, day: date) -> str:
+        for start, end, name in self.holidays:
+            if start <= day <= end: return name
+        return None
+
+
+    def is_school_day(self, day: date) -> bool:
+        if day.weekday() >= 5 or self.holiday(day):
+            return False
+        return not self.schoolyears or any(start <= day <= end for start, end in self.schoolyears)
+
+
+    '''
+    @return the first school day after 'day', or the next weekday if there is none in the known school years
+    '''
+    def next_school_day(self, day: date) -> date:
+        last = max([end for _, end in self.schoolyears], default=day)
+        candidate = day + timedelta(days=1)
+        while candidate <= last or not self.schoolyears:
+            if self.is_school_day(candidate): return candidate
+            candidate += timedelta(days=1)
+        return next_weekday(day)
+
+
+
+'''
+Fallback without a calendar: Mo-Do => next day, Fr-So => Monday
+'''
+def next_weekday(day: date) -> date:
+    weekday = day.weekday()
+    return day + timedelta(days=1 if weekday < 4 else 7-weekday)
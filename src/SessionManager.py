@@ -0,0 +1,118 @@
+from itertools import count
+from threading import Lock
+
+import webuntis
+from src import Constants, Timing
+
+
+'''
+Replacement for a single webuntis.Session that survives expired sessions.
+The credentials are kept in memory only, they are never written anywhere.
+Requests are spread round-robin over a small pool of sessions, each session can be used by several threads at once
+(every call is an independent request). If a call fails with NotLoggedInError, the session logs in again
+and the call is retried once. Several threads noticing the same expiry lead to a single re-login.
+Offers the session methods used by this program, so it can be passed wherever a session is expected.
+'''
+class SessionManager:
+
+
+    def __init__(self, server, username, password, school, useragent=Constants.USER_AGENT, pool_size: int=Constants.SESSION_POOL_SIZE):
+        self.config = {"server": server, "school": school, "username": username, "useragent": useragent}
+        self._sessions = [webuntis.Session(server=server, username=username, password=password, school=school, useragent=useragent)
+                          for _ in range(max(1, pool_size))]
+        self._logins = [0] * len(self._sessions)
+        self._locks = [Lock() for _ in self._sessions]
+        self._round_robin = count()
+
+
+    '''
+    Takes over the credentials of an existing (not necessarily logged in) session.
+    '''
+    @classmethod
+    def from_session(cls, session: webuntis.Session, pool_size: int=Constants.SESSION_POOL_SIZE) -> 'SessionManager':
+        c = session.config
+        # webuntis keeps the config in a FilterDict, which has no get()
+        try:
+            useragent = c["useragent"]
+        except KeyError:
+            useragent = Constants.USER_AGENT
+        return cls(c["server"], c["username"], c["password"], c["school"], useragent, pool_size)
+
+
+    '''
+    Logs in the first session of the pool, so wrong credentials are reported right away. The others log in on first use.
+    '''
+    def login(self) -> 'SessionManager':
+        self._ensure_login(0)
+        return self
+
+
+    def logout(self, suppress_errors=False):
+        for i, session in enumerate(self._sessions):
+            with self._locks[i]:
+                if self._logins[i]:
+                    session.logout(suppress_errors=suppress_errors)
+                self._logins[i] = 0
+
+
+    '''
+    Calls fn(session, *args) with one of the pooled sessions, re-logs in and retries once if the session expired.
+    Use it for work that keeps talking to the session, e.g. resolving the teachers of periods.
+    '''
+    def call(self, fn, *args):
+        index = next(self._round_robin) % len(self._sessions)
+        login = self._ensure_login(index)
+        try:
+            return fn(self._sessions[index], *args)
+        except webuntis.errors.NotLoggedInError:
+            self._relogin(index, login)
+            return fn(self._sessions[index], *args)
+
+
+    def teachers(self):
+        return self.call(lambda s: s.teachers())
+
+
+    def rooms(self):
+        return self.call(lambda s: s.rooms())
+
+
+    def timegrid_units(self):
+        return self.call(lambda s: s.timegrid_units())
+
+
+    def last_import_time(self):
+        return self.call(lambda s: s.last_import_time())
+
+
+    def timetable(self, **kwargs):
+        return self.call(lambda s: s.timetable(**kwargs))
+
+
+    def holidays(self):
+        return self.call(lambda s: s.holidays())
+
+
+    def schoolyears(self):
+        return self.call(lambda s: s.schoolyears())
+
+
+    '''
+    @return the login generation of the session, used to detect whether somebody else already logged in again
+    '''
+    def _ensure_login(self, index) -> int:
+        with self._locks[index]:
+            if not self._logins[index]:
+                with Timing.span('login'):
+                    self._sessions[index].login()
+                self._logins[index] = 1
+            return self._logins[index]
+
+
+    def _relogin(self, index, expired_login):
+        with self._locks[index]:
+            if self._logins[index] != expired_login: return
+            with Timing.span('login'):
+                self._sessions[index].logout(suppress_errors=True)
+                self._sessions[index].login()
+            self._logins[index] += 1
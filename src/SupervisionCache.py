@@ -0,0 +1,122 @@
+import json
+import sqlite3
+from contextlib import closing
+from datetime import datetime, date, timedelta
+
+from src import Constants, UntisBreaks
+
+
+def _serialize(supervision: UntisBreaks.Supervision) -> dict:
+    return {**supervision._asdict(), "start": supervision.start.isoformat(), "end": supervision.end.isoformat()}
+
+
+def _deserialize(entry: dict) -> UntisBreaks.Supervision:
+    entry = {**entry, "start": datetime.fromisoformat(entry["start"]), "end": datetime.fromisoformat(entry["end"])}
+    for names in ("teachers", "original_teachers", "rooms", "original_rooms"):
+        entry[names] = tuple(entry[names])
+    return UntisBreaks.Supervision(**entry)
+
+
+
+'''
+json-compatible form of a day grouped by break start, used by the cache and the FetchDaemon
+'''
+def serialize_day(data: dict) -> list:
+    return [_serialize(sup) for supervisions in data.values() for sup in supervisions]
+
+
+def deserialize_day(entries: list) -> dict:
+    return UntisBreaks._group_by_start([_deserialize(entry) for entry in entries])
+
+
+
+'''
+SQLite-cache of fetched supervisions, one row per server, school and day.
+Also keeps small per-school facts: the roster of supervising teachers and json values under a key (meta).
+Every call opens its own connection, so the cache can be used from worker threads.
+Supervisions older than 'ttl' are neither returned nor kept.
+'''
+class SupervisionCache:
+
+
+    def __init__(self, path: str, ttl: timedelta=timedelta(hours=Constants.SUPERVISION_CACHE_TTL_HOURS)):
+        self.path = path
+        self.ttl = ttl
+        with self._connect() as db, db:
+            db.execute('''CREATE TABLE IF NOT EXISTS supervisions (
+                server TEXT, school TEXT, day TEXT, fetched REAL, payload TEXT,
+                PRIMARY KEY (server, school, day))''')
+            db.execute('''CREATE TABLE IF NOT EXISTS roster (
+                server TEXT, school TEXT, teacher INTEGER, last_seen REAL,
+                PRIMARY KEY (server, school, teacher))''')
+            db.execute('''CREATE TABLE IF NOT EXISTS meta (
+                server TEXT, school TEXT, key TEXT, value TEXT,
+                PRIMARY KEY (server, school, key))''')
+
+
+    def _connect(self):
+        return closing(sqlite3.connect(self.path, timeout=5))
+
+
+    '''
+    @param data: dict grouped by break start, as returned by UntisBreaks.get_offset_supervisions
+    '''
+    def store_day(self, server: str, school: str, day: date, data: dict):
+        payload = json.dumps(serialize_day(data))
+        with self._connect() as db, db:
+            db.execute('INSERT OR REPLACE INTO supervisions VALUES (?, ?, ?, ?, ?)',
+                       (server, school, day.isoformat(), datetime.now().timestamp(), payload))
+
+
+    '''
+    @return dict grouped by break start, or None if there is no fresh entry
+    '''
+    def load_day(self, server: str, school: str, day: date) -> dict:
+        oldest = (datetime.now() - self.ttl).timestamp()
+        with self._connect() as db:
+            row = db.execute('SELECT payload FROM supervisions WHERE server=? AND school=? AND day=? AND fetched>=?',
+                             (server, school, day.isoformat(), oldest)).fetchone()
+        if row is None:
+            return None
+        return deserialize_day(json.loads(row[0]))
+
+
+    '''
+    Removes expired entries and days that are already over.
+    '''
+    def evict(self):
+        oldest = (datetime.now() - self.ttl).timestamp()
+        with self._connect() as db, db:
+            db.execute('DELETE FROM supervisions WHERE fetched<? OR day<?', (oldest, date.today().isoformat()))
+
+
+    '''
+    @return dict teacher id -> when it was last seen with supervisions, for the teachers seen within 'max_age'
+    '''
+    def load_roster(self, server: str, school: str, max_age: timedelta) -> dict:
+        oldest = (datetime.now() - max_age).timestamp()
+        with self._connect() as db, db:
+            db.execute('DELETE FROM roster WHERE server=? AND school=? AND last_seen<?', (server, school, oldest))
+            rows = db.execute('SELECT teacher, last_seen FROM roster WHERE server=? AND school=?', (server, school)).fetchall()
+        return {teacher: datetime.fromtimestamp(last_seen) for teacher, last_seen in rows}
+
+
+    def store_roster(self, server: str, school: str, teacher_ids):
+        now = datetime.now().timestamp()
+        with self._connect() as db, db:
+            db.executemany('INSERT OR REPLACE INTO roster VALUES (?, ?, ?, ?)',
+                           [(server, school, teacher, now) for teacher in teacher_ids])
+
+
+    '''
+    @return the json-decoded value stored under 'key' or None
+    '''
+    def load_meta(self, server: str, school: str, key: str):
+        with self._connect() as db:
+            row = db.execute('SELECT value FROM meta WHERE server=? AND school=? AND key=?', (server, school, key)).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+    def store_meta(self, server: str, school: str, key: str, value):
+        with self._connect() as db, db:
+            db.execute('INSERT OR REPLACE INTO meta VALUES (?, ?, ?, ?)', (server, school, key, json.dumps(value)))
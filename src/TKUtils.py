@@ -1,9 +1,10 @@
 import tkinter as tk
+import queue
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from src import Constants
 from tkinter.messagebox import showerror
-import traceback, sys
-import pyperclip
+import sys
 
 
 '''
@@ -62,6 +63,7 @@ class WidthControlledScrollContainer(ScrollContainer):
     def __init__(self, parent, grid_item_width: int, *args, **kwargs):
         super().__init__(parent, *args, **kwargs)
         self.item_width = grid_item_width
+        self.item_count = None
 
     
     '''
@@ -69,10 +71,344 @@ class WidthControlledScrollContainer(ScrollContainer):
     '''
     def onCanvasConfigure(self, event): 
         super().onCanvasConfigure(event)
-        grid_width = len(self.frame.winfo_children()) * self.item_width
+        self._adjust_width()
+
+
+    '''
+    For frames with hidden (pooled) children: only 'count' items are visible, scrolls back to the start.
+    '''
+    def set_item_count(self, count: int):
+        self.item_count = count
+        self.canvas.xview_moveto(0)
+        self._adjust_width()
+
+
+    def _adjust_width(self):
+        count = self.item_count if self.item_count is not None else len(self.frame.winfo_children())
+        grid_width = count * self.item_width
         self.canvas.itemconfigure(self._frame_id, width=max(grid_width, self.canvas.winfo_width()))
 
 
+'''
+Horizontal scroll container that only creates the items intersecting the visible area, plus 'overscan' items on each side.
+Item widgets are created with 'create_item(parent)' and filled with 'update_item(widget, item)'.
+Widgets scrolled out of view are recycled for the items scrolled into view.
+Like WidthControlledScrollContainer, items are stretched if they don't fill the visible width.
+'''
+class VirtualScrollContainer(tk.Frame):
+
+
+    def __init__(self, parent, item_width: int, create_item, update_item, overscan: int=2, *args, **kwargs):
+        super().__init__(parent, *args, **kwargs)
+        self.item_width = item_width
+        self.create_item = create_item
+        self.update_item = update_item
+        self.overscan = overscan
+        self.items = []
+        self._active = {}
+        self._spare = []
+
+        self.canvas = tk.Canvas(self, highlightthickness=0)
+        self.scrollbar = tk.Scrollbar(self, orient='horizontal', width=16, command=self.canvas.xview)
+        self.canvas.configure(xscrollcommand=self.onCanvasScroll)
+        self.scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.canvas.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        self.canvas.bind('<Configure>', self.onCanvasConfigure)
+
+
+    def set_items(self, items):
+        for index in list(self._active):
+            self._release(index)
+        self.items = list(items)
+        self._layout()
+        self.canvas.xview_moveto(0)
+        self._render()
+
+
+    def onCanvasConfigure(self, event):
+        self._layout()
+        self._render()
+
+
+    '''
+    Called by the canvas whenever the visible area moves.
+    '''
+    def onCanvasScroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._render()
+
+
+    def _column_width(self) -> float:
+        if not self.items: return self.item_width
+        return max(self.item_width, self.canvas.winfo_width() / len(self.items))
+
+
+    def _layout(self):
+        width = self._column_width()
+        height = self.canvas.winfo_height()
+        self.canvas.configure(scrollregion=(0, 0, width*len(self.items), height))
+        for index, (widget, window) in self._active.items():
+            self.canvas.coords(window, index*width, 0)
+            self.canvas.itemconfigure(window, width=width, height=height)
+
+
+    def _render(self):
+        width = self._column_width()
+        left = self.canvas.canvasx(0)
+        first = max(0, int(left // width) - self.overscan)
+        last = min(len(self.items), int((left + self.canvas.winfo_width()) // width) + 1 + self.overscan)
+        for index in [i for i in self._active if not first <= i < last]:
+            self._release(index)
+        for index in range(first, last):
+            if index not in self._active:
+                self._place(index, width)
+
+
+    def _place(self, index, width):
+        if self._spare:
+            widget, window = self._spare.pop()
+        else:
+            widget = self.create_item(self.canvas)
+            window = self.canvas.create_window(0, 0, anchor='nw', window=widget)
+        self.update_item(widget, self.items[index])
+        self.canvas.coords(window, index*width, 0)
+        self.canvas.itemconfigure(window, width=width, height=self.canvas.winfo_height())
+        self._active[index] = (widget, window)
+
+
+    '''
+    Unused widgets are moved left of the scrollregion, where the canvas never shows them.
+    '''
+    def _release(self, index):
+        widget, window = self._active.pop(index)
+        self.canvas.coords(window, -2*self.item_width, 0)
+        self._spare.append((widget, window))
+
+
+
+'''
+Draws a table of two-part columns (upper and lower text) as rectangles and texts on a single canvas,
+instead of a frame and labels per column. Columns are tuples (bg, fg, upper_text, lower_text, tooltip),
+'tooltip' may be None. Hovering a column shows its tooltip (own hit-testing, there are no widgets to bind to).
+Resizing only moves the existing items, at most once per 'relayout_delay' milliseconds.
+'''
+class CanvasTable(tk.Frame):
+
+
+    def __init__(self, parent, item_width: int, padx: int=40, relayout_delay: int=50, hover_delay: int=1000, *args, **kwargs):
+        super().__init__(parent, *args, **kwargs)
+        self.item_width = item_width
+        self.padx = padx
+        self.relayout_delay = relayout_delay
+        self.hover_delay = hover_delay
+        self.columns = []
+        self._items = []
+        self._relayout_job = None
+        self._hover = None
+        self._hover_job = None
+        self._tip = None
+
+        self.canvas = tk.Canvas(self, highlightthickness=0)
+        self.scrollbar = tk.Scrollbar(self, orient='horizontal', width=16, command=self.canvas.xview)
+        self.canvas.configure(xscrollcommand=self.scrollbar.set)
+        self.scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.canvas.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        self.canvas.bind('<Configure>', self.onCanvasConfigure)
+        self.canvas.bind('<Motion>', self.onMotion)
+        self.canvas.bind('<Leave>', lambda e: self._set_hover(None))
+
+
+    def set_columns(self, columns):
+        self._set_hover(None)
+        self.canvas.delete('all')
+        self.columns = list(columns)
+        self._items = [self._draw_column(column) for column in self.columns]
+        self._relayout()
+        self.canvas.xview_moveto(0)
+
+
+    def _draw_column(self, column):
+        bg, fg, upper_text, lower_text, tooltip = column
+        upper = self.canvas.create_rectangle(0, 0, 0, 0, fill=bg, outline="gray")
+        lower = self.canvas.create_rectangle(0, 0, 0, 0, fill=bg, outline="gray")
+        upper_label = self.canvas.create_text(0, 0, text=upper_text, fill=fg, font=("Arial", 10), anchor=tk.S, justify=tk.CENTER)
+        lower_label = self.canvas.create_text(0, 0, text=lower_text, fill=fg, font=("Arial", 10), anchor=tk.N, justify=tk.CENTER)
+        return upper, lower, upper_label, lower_label
+
+
+    def onCanvasConfigure(self, event):
+        if self._relayout_job: self.after_cancel(self._relayout_job)
+        self._relayout_job = self.after(self.relayout_delay, self._relayout)
+
+
+    def _column_width(self) -> float:
+        if not self.columns: return self.item_width
+        return max(self.item_width, self.canvas.winfo_width() / len(self.columns))
+
+
+    def _relayout(self):
+        self._relayout_job = None
+        width = self._column_width()
+        height = self.canvas.winfo_height()
+        middle = height / 2
+        text_width = max(1, width - 2*self.padx)
+        for i, (upper, lower, upper_label, lower_label) in enumerate(self._items):
+            x = i * width
+            self.canvas.coords(upper, x, 0, x+width-1, middle)
+            self.canvas.coords(lower, x, middle, x+width-1, height-1)
+            self.canvas.coords(upper_label, x+width/2, middle-20)
+            self.canvas.coords(lower_label, x+width/2, middle+20)
+            self.canvas.itemconfigure(upper_label, width=text_width)
+            self.canvas.itemconfigure(lower_label, width=text_width)
+        self.canvas.configure(scrollregion=(0, 0, width*len(self._items), height))
+
+
+    '''
+    Hit-testing: the column below the pointer follows from the scroll position and the column width.
+    '''
+    def onMotion(self, event):
+        index = int(self.canvas.canvasx(event.x) // self._column_width())
+        self._set_hover(index if 0 <= index < len(self.columns) else None)
+
+
+    def _set_hover(self, index):
+        if index == self._hover: return
+        self._hover = index
+        if self._hover_job: self.after_cancel(self._hover_job)
+        self._hover_job = None
+        self._hide_tip()
+        if index is not None and self.columns[index][4]:
+            self._hover_job = self.after(self.hover_delay, self._show_tip)
+
+
+    def _show_tip(self):
+        self._hover_job = None
+        self._tip = tk.Toplevel(self)
+        self._tip.wm_overrideredirect(True)
+        x, y = self.winfo_pointerxy()
+        self._tip.wm_geometry(f"+{x+12}+{y+12}")
+        tk.Label(self._tip, text=self.columns[self._hover][4], background="#ffffe0", relief=tk.SOLID, borderwidth=1).pack()
+
+
+    def _hide_tip(self):
+        if self._tip: self._tip.destroy()
+        self._tip = None
+
+
+
+class JobCancelled(Exception):
+    pass
+
+
+
+'''
+Handed to every TkWorker job, long jobs should call check() regularly to stop early once superseded.
+'''
+class CancelToken:
+
+
+    def __init__(self):
+        self._cancelled = False
+
+
+    def cancel(self):
+        self._cancelled = True
+
+
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+
+    def check(self):
+        if self._cancelled: raise JobCancelled()
+
+
+
+'''
+Runs jobs on a single background thread and hands their results back to the Tk main loop.
+Every submit() starts a new generation of its channel: the previous token of that channel is cancelled,
+its job is skipped if it hasn't started yet and its results are discarded.
+Results, errors and post()-ed callbacks travel through a queue that is drained with after(),
+so widgets are only ever touched from the main loop. Stops when 'widget' is destroyed.
+'''
+class TkWorker:
+
+
+    def __init__(self, widget: tk.Widget, poll_ms: int=50):
+        self.widget = widget
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._queue = queue.Queue()
+        self._tokens = {}
+        self._closed = False
+        widget.bind('<Destroy>', lambda e: self.close(), add='+')
+        widget.after(poll_ms, self._drain)
+
+
+    '''
+    @param job: called with the CancelToken on the worker thread
+    @param on_done: called with the job's result on the main loop
+    @param on_error: called with the raised exception on the main loop
+    '''
+    def submit(self, job, on_done=None, on_error=None, channel: str="load") -> CancelToken:
+        previous = self._tokens.get(channel)
+        if previous: previous.cancel()
+        token = CancelToken()
+        self._tokens[channel] = token
+        self._executor.submit(self._run, token, job, on_done, on_error)
+        return token
+
+
+    '''
+    Thread-safe: runs callback(*args) on the main loop, unless the token has been cancelled by then.
+    '''
+    def post(self, token: CancelToken, callback, *args):
+        self._queue.put((token, callback, args))
+
+
+    '''
+    Cancels the current job of the channel, a running job stops at its next check().
+    '''
+    def cancel(self, channel: str):
+        token = self._tokens.get(channel)
+        if token: token.cancel()
+
+
+    def close(self):
+        self._closed = True
+        for token in self._tokens.values():
+            token.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+    def _run(self, token, job, on_done, on_error):
+        if token.cancelled(): return
+        try:
+            result = job(token)
+        except JobCancelled:
+            return
+        except Exception as e:
+            return self.post(token, on_error, e)
+        self.post(token, on_done, result)
+
+
+    def _drain(self):
+        if self._closed: return
+        while True:
+            try:
+                token, callback, args = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if callback and not token.cancelled():
+                try:
+                    callback(*args)
+                except Exception as e:
+                    TKErrorHandler.report_callback_exception(self.widget, e.__class__.__name__, str(e), e.__traceback__)
+        if not self._closed:
+            self.widget.after(self.poll_ms, self._drain)
+
+
+
 class FillerFrame(tk.Frame):
     def __init__(self, parent, **kwargs):
         super().__init__(parent, **{"bg":Constants.BACKGROUND, **kwargs})
@@ -117,13 +453,16 @@ class TKErrorHandler:
         showerror("Fehler", message=msg)
 
 
+    # pyperclip and traceback are only imported once an error is reported, they are not needed for the startup
     def _copy(exc, val, tb):
+        import pyperclip
         msg = TKErrorHandler._prepare_clipboard_msg(exc, val, tb)
         if sys.stderr: sys.stderr.write(msg)
         pyperclip.copy(msg)
 
 
     def _prepare_clipboard_msg(exc, val, tb):
+        import traceback
         lines = traceback.format_tb(tb)
         tb_result = lines.pop(0)
         for line in lines:
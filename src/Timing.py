@@ -0,0 +1,170 @@
+'''
+Phase timing of loads: a trace collects the durations of its spans (login, teachers, sweep, grouping, widgets ...)
+and the latencies of single requests, and is written as one json line to a rotating log when it ends.
+Spans and requests outside of a trace cost nearly nothing, so the calls can stay in the code.
+
+    with Timing.trace("fetch_break_info"):
+        with Timing.span("get_day"):
+            ...
+'''
+import json
+import logging
+import time
+from contextlib import contextmanager
+from functools import wraps
+from logging.handlers import RotatingFileHandler
+from threading import Lock, local
+
+from src import Constants
+
+
+BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500)
+
+_logger = logging.getLogger("webuntis-breaks.timing")
+_logger.propagate = False
+_active = local()
+_last = {}
+_last_lock = Lock()
+
+
+'''
+Spans and request latencies of one load, filled from several threads.
+'''
+class Trace:
+
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.time()
+        self.total = None
+        self.spans = {}
+        self.requests = {}
+        self._lock = Lock()
+
+
+    def add_span(self, name: str, seconds: float):
+        with self._lock:
+            self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+
+    def add_request(self, name: str, seconds: float):
+        with self._lock:
+            self.requests.setdefault(name, []).append(seconds)
+
+
+    '''
+    @return count, p50, p90, max (ms) and counts per bucket (upper bound in ms, "inf" for the rest) of a request type
+    '''
+    def histogram(self, name: str) -> dict:
+        with self._lock:
+            latencies = sorted(seconds * 1000 for seconds in self.requests.get(name, []))
+        if not latencies:
+            return {"count": 0}
+        buckets = {str(bound): 0 for bound in BUCKETS_MS}
+        buckets["inf"] = 0
+        for ms in latencies:
+            bound = next((b for b in BUCKETS_MS if ms <= b), None)
+            buckets[str(bound) if bound else "inf"] += 1
+        percentile = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+        return {"count": len(latencies), "p50": round(percentile(0.5), 1), "p90": round(percentile(0.9), 1),
+                "max": round(latencies[-1], 1), "buckets": buckets}
+
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            spans = {name: round(seconds * 1000, 1) for name, seconds in self.spans.items()}
+            request_names = list(self.requests)
+        return {"trace": self.name, "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+                "total_ms": round((self.total or 0) * 1000, 1), "spans_ms": spans,
+                "requests": {name: self.histogram(name) for name in request_names}}
+
+
+    '''
+    One line per phase for the overlay, e.g. "sweep  812 ms"
+    '''
+    def summary(self) -> str:
+        data = self.as_dict()
+        lines = [f"{data['trace']}  {data['total_ms']:.0f} ms"]
+        lines += [f"  {name}  {ms:.0f} ms" for name, ms in data["spans_ms"].items()]
+        for name, hist in data["requests"].items():
+            if hist["count"]:
+                lines.append(f"  {name}  n={hist['count']}  p50 {hist['p50']:.0f}  p90 {hist['p90']:.0f}  max {hist['max']:.0f} ms")
+        return "\n".join(lines)
+
+
+
+'''
+Writes finished traces to 'path' (rotated at TIMING_LOG_BYTES, TIMING_LOG_BACKUPS old files are kept).
+Without a call to enable_log the traces are only kept in memory (see last).
+'''
+def enable_log(path: str):
+    if _logger.handlers: return
+    handler = RotatingFileHandler(path, maxBytes=Constants.TIMING_LOG_BYTES, backupCount=Constants.TIMING_LOG_BACKUPS, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    _logger.addHandler(handler)
+    _logger.setLevel(logging.INFO)
+
+
+@contextmanager
+def trace(name: str):
+    outer = getattr(_active, "trace", None)
+    current = Trace(name)
+    _active.trace = current
+    start = time.perf_counter()
+    try:
+        yield current
+    finally:
+        current.total = time.perf_counter() - start
+        _active.trace = outer
+        with _last_lock:
+            _last[name] = current
+        if _logger.handlers:
+            _logger.info(json.dumps(current.as_dict()))
+
+
+@contextmanager
+def span(name: str):
+    current = getattr(_active, "trace", None)
+    if current is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        current.add_span(name, time.perf_counter() - start)
+
+
+'''
+Adds the latency of one request of type 'name' to the trace of this thread.
+'''
+def observe(name: str, seconds: float):
+    current = getattr(_active, "trace", None)
+    if current is not None:
+        current.add_request(name, seconds)
+
+
+'''
+Wraps fn so it runs in the trace of the calling thread, for work handed to a thread pool.
+'''
+def bind(fn):
+    current = getattr(_active, "trace", None)
+    if current is None:
+        return fn
+    @wraps(fn)
+    def traced(*args, **kwargs):
+        outer = getattr(_active, "trace", None)
+        _active.trace = current
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _active.trace = outer
+    return traced
+
+
+'''
+@return the last finished trace of that name or None
+'''
+def last(name: str) -> Trace:
+    with _last_lock:
+        return _last.get(name)
@@ -1,5 +1,72 @@
 import datetime
+import time
+from bisect import bisect_left, bisect_right
+from threading import Lock
+from typing import NamedTuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import webuntis
+from src import Constants, MasterData, SessionManager, RequestScheduler, SchoolCalendar, Timing
+
+
+
+'''
+Compact, immutable record (a NamedTuple, so __slots__ = ()) of one break supervision.
+All names are resolved when the record is created on the fetching thread,
+rendering never has to touch webuntis master data.
+'''
+class Supervision(NamedTuple):
+    id: int
+    start: datetime.datetime
+    end: datetime.datetime
+    code: str
+    teachers: tuple
+    original_teachers: tuple
+    rooms: tuple
+    original_rooms: tuple
+
+
+    '''
+    @param names: (teacher names by id, room names by id) as returned by MasterData.names, resolves without any request.
+                  Without it the names are resolved by webuntis through the session.
+    '''
+    @classmethod
+    def from_period(cls, period, names: tuple=None) -> 'Supervision':
+        if names is None:
+            return cls(period.id, period.start, period.end, period.code,
+                       _element_names(lambda: period.teachers, 'full_name'),
+                       _element_names(lambda: period.original_teachers, 'full_name'),
+                       _element_names(lambda: period.rooms, 'long_name'),
+                       _element_names(lambda: period.original_rooms, 'long_name'))
+        teachers, rooms = names
+        # PeriodObject only offers teachers/rooms resolved through the session's request cache (which refetches once
+        # its 20 entries are taken by timetables), so the raw ids are read from _data, e.g. 'te': [{'id': 12, 'orgid': 7}].
+        # Read defensively, a missing part counts as no elements.
+        elements = getattr(period, '_data', None) or {}
+        return cls(period.id, period.start, period.end, period.code,
+                   _names_by_id(elements.get('te'), 'id', teachers),
+                   _names_by_id(elements.get('te'), 'orgid', teachers),
+                   _names_by_id(elements.get('ro'), 'id', rooms),
+                   _names_by_id(elements.get('ro'), 'orgid', rooms))
+
+
+
+'''
+For unknown reasons, an index error is thrown if the list is empty.
+Printing the period show a teacher as id=0, but no such teachers exists,
+therefore I can only reckon this is the webuntis way of saying there is no teacher.
+'''
+def _element_names(get_elements, attribute) -> tuple:
+    try:
+        return tuple(getattr(e, attribute) for e in get_elements())
+    except IndexError:
+        return ()
+
+
+'''
+Unknown ids are left out, like the id=0 webuntis sends for "no teacher", and so are elements without the key.
+'''
+def _names_by_id(elements, key, names: dict) -> tuple:
+    return tuple(names[e[key]] for e in elements or () if e.get(key) in names)
 
 
 def _group_by_start(break_superv: list) -> dict:
@@ -11,35 +78,430 @@ def _group_by_start(break_superv: list) -> dict:
     return result
 
 
-def _supervisions_from_day(session: webuntis.Session, offset_to_current_day) -> set:
-    all_supervisions = set()
+def _offset_day(offset_to_current_day) -> datetime.datetime:
     today = datetime.datetime.today()
-    current_day = datetime.datetime(today.year,today.month,today.day) + datetime.timedelta(days=offset_to_current_day)
-    for teacher in session.teachers():
-        break_superv = session.timetable(teacher=teacher.id, start=current_day, end=current_day).filter(type='bs')
-        for bs in break_superv:
-            all_supervisions.add(bs)
+    return datetime.datetime(today.year,today.month,today.day) + datetime.timedelta(days=offset_to_current_day)
+
+
+def _teacher_supervisions(session: webuntis.Session, teacher_id, start, end, names=None) -> list:
+    requested = time.perf_counter()
+    periods = session.timetable(teacher=teacher_id, start=start, end=end).filter(type='bs')
+    Timing.observe('timetable', time.perf_counter() - requested)
+    return [Supervision.from_period(period, names) for period in periods]
+
+
+'''
+With a SessionManager the request and the name resolution are retried together after a re-login.
+'''
+def _fetch_teacher(session, teacher_id, start, end, names=None) -> list:
+    if isinstance(session, SessionManager.SessionManager):
+        return session.call(_teacher_supervisions, teacher_id, start, end, names)
+    return _teacher_supervisions(session, teacher_id, start, end, names)
+
+
+'''
+Fetches the timetables of all teachers concurrently, at most 'workers' requests are in flight at once.
+Streams the results: yields (teachers done, teachers total, teacher, supervisions of that teacher) as each timetable arrives.
+@param scheduler: optional RequestScheduler for rate limiting and retries of each request
+@param failed: if given, teachers whose requests failed are appended to it and the sweep goes on
+               (the error is only raised if every teacher failed), otherwise the first error is raised.
+@param names: see Supervision.from_period
+If the sweep is aborted or the consumer stops iterating, pending requests are cancelled.
+'''
+def iter_supervisions(session: webuntis.Session, start, end, workers=Constants.FETCH_WORKERS, teachers=None, scheduler=None, failed: list=None, names: tuple=None):
+    run = Timing.bind(scheduler.run if scheduler else lambda fn, *args: fn(*args))
+    teachers = list(teachers if teachers is not None else run(session.teachers))
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        jobs = {pool.submit(run, _fetch_teacher, session, t.id, start, end, names): t for t in teachers}
+        try:
+            for done, job in enumerate(as_completed(jobs), 1):
+                yield done, len(jobs), jobs[job], _job_result(job, jobs[job], failed, len(jobs))
+        except BaseException:
+            for job in jobs: job.cancel()
+            raise
+
+
+def _job_result(job, teacher, failed: list, total: int) -> list:
+    if failed is None:
+        return job.result()
+    try:
+        return job.result()
+    except Exception:
+        failed.append(teacher)
+        if len(failed) == total: raise
+        return []
+
+
+def _supervisions_from_range(session: webuntis.Session, start, end, workers=Constants.FETCH_WORKERS, teachers=None, on_progress=None, scheduler=None, failed=None, supervising=None, names=None) -> set:
+    all_supervisions = set()
+    for done, total, teacher, supervisions in iter_supervisions(session, start, end, workers, teachers, scheduler, failed, names):
+        all_supervisions.update(supervisions)
+        if supervisions and supervising is not None: supervising.add(teacher.id)
+        if on_progress: on_progress(done, total, all_supervisions)
     return all_supervisions
 
 
+def _supervisions_from_day(session: webuntis.Session, offset_to_current_day, workers=Constants.FETCH_WORKERS) -> set:
+    current_day = _offset_day(offset_to_current_day)
+    return _supervisions_from_range(session, current_day, current_day, workers)
+
+
 '''
 @param session: containing server, username, password, school and useragent information
 @param offset: examples: 0 => today  |  1 => tomorrow  |  -1 => yesterday
-@return dict-keys: datetime (always from current day) / dict-values: list of all break-supervisions (webuntis.objects.PeriodObject)
+@param workers: maximum number of concurrent timetable requests
+@return dict-keys: datetime (always from current day) / dict-values: list of all break-supervisions (Supervision)
 '''
-def get_offset_supervisions(session: webuntis.Session, offset: int) -> dict:
-    supervisions = _supervisions_from_day(session, offset)
+def get_offset_supervisions(session: webuntis.Session, offset: int, workers: int=Constants.FETCH_WORKERS) -> dict:
+    supervisions = _supervisions_from_day(session, offset, workers)
     return _group_by_start(supervisions)
 
 
 '''
 @param session: containing server, username, password, school and useragent information
-@return dict-keys: datetime (always from current day) / dict-values: list of all break-supervisions (webuntis.objects.PeriodObject)
+@return dict-keys: datetime (always from current day) / dict-values: list of all break-supervisions (Supervision)
 '''
 def get_todays_supervisions(session: webuntis.Session) -> dict:
     return get_offset_supervisions(session, 0)
 
 
+'''
+@param start, end: first and last day (inclusive), each teacher's timetable is requested once for the whole range
+@param teachers: teachers to query, defaults to session.teachers()
+@param on_progress: called as on_progress(teachers done, teachers total, result so far) after each teacher
+@param scheduler, failed, names: see iter_supervisions
+@param supervising: if given, the ids of teachers with supervisions are added to it
+@return dict-keys: datetime.date / dict-values: dict grouped by break start like get_offset_supervisions, days without supervisions are left out
+'''
+def get_range_supervisions(session: webuntis.Session, start: datetime.date, end: datetime.date, workers: int=Constants.FETCH_WORKERS, teachers=None, on_progress=None, scheduler=None, failed: list=None, supervising: set=None, names: tuple=None) -> dict:
+    first = datetime.datetime(start.year, start.month, start.day)
+    last = datetime.datetime(end.year, end.month, end.day)
+    progress = (lambda done, total, supervisions: on_progress(done, total, _group_by_day(supervisions))) if on_progress else None
+    with Timing.span('sweep'):
+        supervisions = _supervisions_from_range(session, first, last, workers, teachers, progress, scheduler, failed, supervising, names)
+    with Timing.span('group'):
+        return _group_by_day(supervisions)
+
+
+def _group_by_day(supervisions) -> dict:
+    by_day = {}
+    for bs in supervisions:
+        by_day.setdefault(bs.start.date(), []).append(bs)
+    return {day: _group_by_start(day_supervisions) for day, day_supervisions in by_day.items()}
+
+
+def week_start(day: datetime.date) -> datetime.date:
+    return day - datetime.timedelta(days=day.weekday())
+
+
+def offset_date(offset: int) -> datetime.date:
+    return _offset_day(offset).date()
+
+
+'''
+Untis numbers the weekdays from 1=Sunday to 7=Saturday.
+'''
+def _untis_weekday(day: datetime.date) -> int:
+    return (day.weekday() + 1) % 7 + 1
+
+
+def _as_time(value) -> datetime.time:
+    if isinstance(value, datetime.datetime): return value.time()
+    if isinstance(value, datetime.time): return value
+    return datetime.time(int(value) // 100, int(value) % 100)   # raw HHMM as sent by the api
+
+
+'''
+Reduces session.timegrid_units() to {untis weekday: [[start, end] of each unit as 'HH:MM']}, small enough to be cached as json.
+'''
+def timegrid_table(timegrid) -> dict:
+    return {str(day.day): [[_as_time(unit.start).strftime('%H:%M'), _as_time(unit.end).strftime('%H:%M')] for unit in day.time_units]
+            for day in timegrid}
+
+
+'''
+Break slots derived from the timegrid: a break starts where a unit ends and the next unit starts later.
+@param table: as returned by timegrid_table
+@return sorted break starts of that day
+'''
+def timegrid_breaks(table: dict, day: datetime.date) -> list[datetime.datetime]:
+    units = sorted(table.get(str(_untis_weekday(day)), []))
+    slots = [end for (_, end), (start, _) in zip(units, units[1:]) if end < start]
+    return [datetime.datetime.combine(day, datetime.time.fromisoformat(slot)) for slot in slots]
+
+
+'''
+Learned roster of the teachers who had break supervisions in the last ROSTER_KEEP_DAYS, per school.
+Sweeps only query these teachers, a full sweep over all teachers runs if the roster is empty
+or the last full sweep is older than ROSTER_FULL_SWEEP_HOURS, so newcomers show up by then.
+Persisted in the SupervisionCache if one is given, otherwise only kept in memory.
+'''
+class SupervisorRoster:
+
+
+    def __init__(self, session: webuntis.Session, cache=None):
+        self.session = session
+        self.cache = cache
+        self._teachers = None
+        self._last_full = None
+        self._lock = Lock()
+
+
+    '''
+    @return (teachers to query, whether that is a full sweep)
+    '''
+    def select(self, teachers) -> tuple:
+        with self._lock:
+            self._load()
+            now = datetime.datetime.now()
+            oldest = now - datetime.timedelta(days=Constants.ROSTER_KEEP_DAYS)
+            self._teachers = {t: seen for t, seen in self._teachers.items() if seen >= oldest}
+            full_due = not self._last_full or now - self._last_full > datetime.timedelta(hours=Constants.ROSTER_FULL_SWEEP_HOURS)
+            if full_due or not self._teachers:
+                return list(teachers), True
+            return [t for t in teachers if t.id in self._teachers], False
+
+
+    '''
+    @param supervising: ids of the teachers who had supervisions in the sweep
+    @param full: whether all teachers were queried, a sweep with failed teachers is not full (they may be supervisors)
+    '''
+    def learn(self, supervising: set, full: bool):
+        with self._lock:
+            now = datetime.datetime.now()
+            self._teachers = {**(self._teachers or {}), **dict.fromkeys(supervising, now)}
+            if full: self._last_full = now
+            self._store(supervising, full)
+
+
+    def _key(self):
+        return self.session.config['server'], self.session.config['school']
+
+
+    def _load(self):
+        if self._teachers is not None: return
+        if not self.cache:
+            self._teachers = {}
+            return
+        try:
+            self._teachers = self.cache.load_roster(*self._key(), datetime.timedelta(days=Constants.ROSTER_KEEP_DAYS))
+            last_full = self.cache.load_meta(*self._key(), 'roster_full_sweep')
+            self._last_full = datetime.datetime.fromisoformat(last_full) if last_full else None
+        except Exception:
+            self._teachers = {}
+
+
+    def _store(self, supervising: set, full: bool):
+        if not self.cache: return
+        try:
+            self.cache.store_roster(*self._key(), supervising)
+            if full: self.cache.store_meta(*self._key(), 'roster_full_sweep', self._last_full.isoformat())
+        except Exception:
+            pass    # the cache is optional
+
+
+
+'''
+In-memory index of supervisions keyed by date and then break start.
+Days are loaded a whole school week (Mo-Fr) at a time, so navigating within a loaded week needs no requests.
+'''
+class SupervisionIndex:
+
+
+    '''
+    @param master: MasterData of the session, shared with the caller if given
+    @param cache: optional SupervisionCache, loaded weeks are written to it and snapshots can be read from it
+    @param scheduler: RequestScheduler for all requests of the index, one with 'workers' requests in flight if not given.
+                      A MasterData passed in should use the same one.
+    '''
+    def __init__(self, session: webuntis.Session, workers: int=Constants.FETCH_WORKERS, master=None, cache=None, scheduler=None):
+        self.session = session
+        self.workers = workers
+        self.scheduler = scheduler if scheduler else RequestScheduler.RequestScheduler(max_concurrency=workers)
+        self.master = master if master else MasterData.MasterData(session, scheduler=self.scheduler)
+        self.cache = cache
+        self.roster = SupervisorRoster(session, cache)
+        self._timegrid = None
+        self._calendar = None
+        self._calendar_retry = None
+        self._days = {}
+        self._weeks = set()
+        self._failed = {}
+        self._lock = Lock()
+
+
+    '''
+    @param on_progress: only called if the week is loaded, as on_progress(teachers done, teachers total, partial dict of that day)
+    @return dict-keys: datetime / dict-values: list of all break-supervisions of that day, loads the week if necessary.
+            Days the school calendar knows to be free are empty without any requests.
+    '''
+    def get_day(self, day: datetime.date, on_progress=None) -> dict:
+        monday = week_start(day)
+        if not self.school_calendar().is_school_day(day):
+            return {}
+        with self._lock:
+            if monday not in self._weeks:
+                progress = (lambda done, total, days: on_progress(done, total, days.get(day, {}))) if on_progress else None
+                self._load_week(monday, progress)
+            return self._days.get(day, {})
+
+
+    '''
+    @return the last cached state of that day (possibly outdated) or None, never sends requests
+    '''
+    def cached_day(self, day: datetime.date) -> dict:
+        if not self.cache: return None
+        return self.cache.load_day(self.session.config['server'], self.session.config['school'], day)
+
+
+    '''
+    Skeleton of a day before its supervisions are known: the break slots of the school's timegrid.
+    The timegrid is a single request and is kept in the cache for TIMEGRID_CACHE_DAYS.
+    @return sorted break starts of that day, none on days without school
+    '''
+    def break_slots(self, day: datetime.date) -> list:
+        if not self.school_calendar().is_school_day(day):
+            return []
+        if self._timegrid is None:
+            self._timegrid = self._cached_meta('timegrid', Constants.TIMEGRID_CACHE_DAYS)
+        if self._timegrid is None:
+            self._timegrid = timegrid_table(self.master.timegrid())
+            self._store_meta('timegrid', self._timegrid)
+        return timegrid_breaks(self._timegrid, day)
+
+
+    '''
+    Holidays and school years, two requests kept in the cache for CALENDAR_CACHE_DAYS.
+    If they can't be loaded, a calendar of plain weekdays is used and they are requested again after CALENDAR_RETRY_MINUTES.
+    '''
+    def school_calendar(self) -> SchoolCalendar.SchoolCalendar:
+        if self._calendar is None:
+            entry = self._cached_meta('calendar', Constants.CALENDAR_CACHE_DAYS)
+            if entry is not None:
+                self._calendar = SchoolCalendar.SchoolCalendar.from_json(entry)
+        if self._calendar is None:
+            if self._calendar_retry and datetime.datetime.now() < self._calendar_retry:
+                return SchoolCalendar.SchoolCalendar([], [])
+            try:
+                self._calendar = self.scheduler.run(SchoolCalendar.SchoolCalendar.from_session, self.session)
+            except (webuntis.errors.Error, OSError):
+                self._calendar_retry = datetime.datetime.now() + datetime.timedelta(minutes=Constants.CALENDAR_RETRY_MINUTES)
+                return SchoolCalendar.SchoolCalendar([], [])
+            self._store_meta('calendar', self._calendar.to_json())
+        return self._calendar
+
+
+    '''
+    Never sends requests, days are only skipped once the calendar was loaded by a fetch.
+    '''
+    def next_school_day(self, day: datetime.date) -> datetime.date:
+        if self._calendar is None:
+            return SchoolCalendar.next_weekday(day)
+        return self._calendar.next_school_day(day)
+
+
+    '''
+    @return the json value stored under 'key' in the cache if it is younger than 'max_days', otherwise None
+    '''
+    def _cached_meta(self, key: str, max_days: int):
+        if not self.cache: return None
+        try:
+            entry = self.cache.load_meta(self.session.config['server'], self.session.config['school'], key)
+        except Exception:
+            return None
+        oldest = datetime.date.today() - datetime.timedelta(days=max_days)
+        if not entry or datetime.date.fromisoformat(entry['fetched']) < oldest: return None
+        return entry.get('value')
+
+
+    def _store_meta(self, key: str, value):
+        if not self.cache: return
+        try:
+            self.cache.store_meta(self.session.config['server'], self.session.config['school'], key,
+                                  {'fetched': datetime.date.today().isoformat(), 'value': value})
+        except Exception:
+            pass    # the cache is optional
+
+
+    def is_loaded(self, day: datetime.date) -> bool:
+        return week_start(day) in self._weeks
+
+
+    '''
+    @return full names of the teachers whose timetables could not be loaded for the week of that day
+    '''
+    def failed_teachers(self, day: datetime.date) -> list:
+        return self._failed.get(week_start(day), [])
+
+
+    '''
+    Forgets all loaded weeks, the next lookup fetches again.
+    '''
+    def invalidate(self):
+        with self._lock:
+            self._clear()
+
+
+    '''
+    Change detection: a single getLatestImportTime request instead of a sweep.
+    Loaded weeks are only dropped if the server imported new data since they were loaded,
+    incomplete weeks (failed teachers) are always fetched again.
+    @return True if the data moved, the next lookups fetch again
+    '''
+    def refresh(self) -> bool:
+        with self._lock:
+            changed = self.master.check_import_time()
+            if changed:
+                self._clear()
+            for monday in [m for m, failed in self._failed.items() if failed]:
+                self._weeks.discard(monday)
+            return changed
+
+
+    def _clear(self):
+        self._days.clear()
+        self._weeks.clear()
+        self._failed.clear()
+
+
+    def _load_week(self, monday: datetime.date, on_progress=None):
+        friday = monday + datetime.timedelta(days=4)
+        with Timing.span('check_import_time'):
+            if self.master.check_import_time():
+                # weeks loaded before the import are outdated as well
+                self._clear()
+        with Timing.span('master_data'):
+            names = self.master.names()
+            teachers, full_sweep = self.roster.select(self.master.teachers())
+        failed, supervising = [], set()
+        week = get_range_supervisions(self.session, monday, friday, self.workers, teachers, on_progress,
+                                      self.scheduler, failed, supervising, names)
+        self.roster.learn(supervising, full_sweep and not failed)
+        for i in range(5):
+            day = monday + datetime.timedelta(days=i)
+            self._days[day] = week.get(day, {})
+        self._weeks.add(monday)
+        self._failed[monday] = sorted(teacher.full_name for teacher in failed)
+        with Timing.span('store'):
+            self._store_week(monday)
+
+
+    '''
+    Incomplete weeks are not cached, they would be shown as if they were complete.
+    '''
+    def _store_week(self, monday: datetime.date):
+        if not self.cache or self._failed[monday]: return
+        server, school = self.session.config['server'], self.session.config['school']
+        try:
+            for i in range(5):
+                day = monday + datetime.timedelta(days=i)
+                self.cache.store_day(server, school, day, self._days[day])
+            self.cache.evict()
+        except Exception:
+            pass    # the cache is optional, a failing write must not fail the load
+
+
+
 '''
 @param datetime_options: all breaks in question, usually invoked with data.keys() from data=get_todays_supervisions(session)
 @return next break considering local time. If there is no upcoming break-datetime, this method returns the last available break
@@ -69,3 +531,65 @@ def get_relative_break(selected_datetime: datetime.datetime, datetime_options: l
     if 0 <= index+offset < len(sdates):
         return sdates[index+offset]
     return None
+
+
+
+'''
+Sorted break starts of one data load, built once and queried in O(log n) with bisect.
+Answers the same questions as next_break_time and get_relative_break without sorting on every call.
+'''
+class BreakSchedule:
+
+
+    def __init__(self, break_times):
+        self.times = sorted(set(break_times))
+
+
+    def __len__(self):
+        return len(self.times)
+
+
+    def __contains__(self, break_time):
+        index = bisect_left(self.times, break_time)
+        return index < len(self.times) and self.times[index] == break_time
+
+
+    '''
+    Same result as next_break_time: the first break starting at or after 'current' (default: now),
+    the last break of the day if none is upcoming and None if there are no breaks.
+    '''
+    def next(self, current: datetime.datetime=None) -> datetime.datetime:
+        if not self.times:
+            return None
+        current = current if current else datetime.datetime.now()
+        index = bisect_left(self.times, current)
+        return self.times[index] if index < len(self.times) else self.times[-1]
+
+
+    '''
+    @return the last break starting before 'current' or None
+    '''
+    def previous(self, current: datetime.datetime) -> datetime.datetime:
+        index = bisect_left(self.times, current)
+        return self.times[index-1] if index > 0 else None
+
+
+    '''
+    @return the break that has started most recently at time 't' or None if no break has started yet
+    '''
+    def current_at(self, t: datetime.datetime) -> datetime.datetime:
+        index = bisect_right(self.times, t)
+        return self.times[index-1] if index > 0 else None
+
+
+    '''
+    Same result as get_relative_break.
+    '''
+    def relative(self, selected_datetime: datetime.datetime, offset: int) -> datetime.datetime:
+        if not selected_datetime: return None
+        index = bisect_left(self.times, selected_datetime)
+        if index == len(self.times) or self.times[index] != selected_datetime:
+            raise ValueError('Selected_datetime must itself be from the schedule')
+        if 0 <= index+offset < len(self.times):
+            return self.times[index+offset]
+        return None
@@ -0,0 +1,218 @@
+'''
+SupervisionIndex against a ReplayServer: a real webuntis.Session behind a SessionManager talks to it over HTTP,
+so logins, expired sessions and server errors go the same way as with WebUntis.
+'''
+import datetime
+import random
+import threading
+
+import pytest
+import webuntis
+
+from src import ReplayServer, RequestScheduler, SessionManager, TKUtils, UntisBreaks
+
+
+MONDAY = datetime.date(2024, 3, 4)
+FRIDAY = MONDAY + datetime.timedelta(days=4)
+HOLIDAY = MONDAY + datetime.timedelta(days=2)
+TEACHERS = 12
+
+
+def _untis_date(day: datetime.date) -> int:
+    return int(day.strftime("%Y%m%d"))
+
+
+'''
+One week of a school: every third teacher supervises the 9:30 break on Monday, teacher 6 is irregular
+and substitutes teacher 1 in room 2 instead of room 1. Wednesday is a holiday.
+The timetables of the 'failing' teachers answer with a server error.
+'''
+def _recording(without=(), failing=()) -> dict:
+    teachers = [{"id": i, "name": f"L{i}", "foreName": "Vor", "longName": f"Nach{i}", "title": ""} for i in range(1, TEACHERS + 1)]
+    rooms = [{"id": 1, "name": "H1", "longName": "Hof 1"}, {"id": 2, "name": "H2", "longName": "Hof 2"}]
+    calls = [
+        {"method": "getTeachers", "params": {}, "result": teachers},
+        {"method": "getRooms", "params": {}, "result": rooms},
+        {"method": "getLatestImportTime", "params": {}, "result": 1700000000000},
+        {"method": "getHolidays", "params": {}, "result": [{"id": 1, "name": "Frei", "longName": "Frei",
+                                                             "startDate": _untis_date(HOLIDAY), "endDate": _untis_date(HOLIDAY)}]},
+        {"method": "getSchoolyears", "params": {}, "result": [{"id": 1, "name": "2023/24", "startDate": 20230901, "endDate": 20240731}]},
+        {"method": "getTimegridUnits", "params": {}, "result": []},
+    ]
+    for teacher in teachers:
+        periods = []
+        if teacher["id"] % 3 == 0:
+            period = {"id": teacher["id"], "date": _untis_date(MONDAY), "startTime": 930, "endTime": 950, "lstype": "bs",
+                      "kl": [], "su": [], "te": [{"id": teacher["id"]}], "ro": [{"id": 1}]}
+            if teacher["id"] == 6:
+                period.update(code="irregular", te=[{"id": 6, "orgid": 1}], ro=[{"id": 2, "orgid": 1}])
+            periods.append(period)
+        params = {"id": teacher["id"], "type": 2, "startDate": _untis_date(MONDAY), "endDate": _untis_date(FRIDAY)}
+        if teacher["id"] in failing:
+            calls.append({"method": "getTimetable", "params": params, "error": {"code": -32000, "message": "server error"}})
+        else:
+            calls.append({"method": "getTimetable", "params": params, "result": periods})
+    calls = [call for call in calls if call["method"] not in without]
+    return {"recorded_on": MONDAY.isoformat(), "login": {"personType": 2, "personId": 0}, "calls": calls}
+
+
+
+'''
+Counts the requests per method and can announce a new import.
+'''
+class _CountingServer(ReplayServer.ReplayServer):
+
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.counts = {}
+        self.import_time = None
+        self._count_lock = threading.Lock()
+
+
+    def _answer(self, request: dict, cookie: str) -> dict:
+        method = request.get("method")
+        with self._count_lock:
+            self.counts[method] = self.counts.get(method, 0) + 1
+        answer = super()._answer(request, cookie)
+        if method == "getLatestImportTime" and self.import_time and "result" in answer:
+            answer["result"] = self.import_time
+        return answer
+
+
+
+@pytest.fixture
+def recording() -> dict:
+    return _recording()
+
+
+@pytest.fixture
+def faults() -> dict:
+    return {}
+
+
+@pytest.fixture
+def workers() -> int:
+    return 4
+
+
+@pytest.fixture
+def retries() -> dict:
+    return {}
+
+
+@pytest.fixture
+def server(recording, faults):
+    server = _CountingServer(("127.0.0.1", 0), recording, **faults)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+'''
+Logs in the way launch(session=...) does, from the config of a plain webuntis.Session.
+'''
+@pytest.fixture
+def index(server, workers, retries) -> UntisBreaks.SupervisionIndex:
+    plain = webuntis.Session(server=server.url, username="user", password="secret", school="school")
+    session = SessionManager.SessionManager.from_session(plain).login()
+    scheduler = RequestScheduler.RequestScheduler(rate=1000, burst=100, max_concurrency=workers, **retries)
+    yield UntisBreaks.SupervisionIndex(session, workers, scheduler=scheduler)
+    session.logout(suppress_errors=True)
+
+
+def _names(day: dict) -> set:
+    return {(sup.teachers, sup.original_teachers, sup.rooms, sup.original_rooms, sup.code) for sups in day.values() for sup in sups}
+
+
+EXPECTED_MONDAY = {
+    (("Vor Nach3",), (), ("Hof 1",), (), None),
+    (("Vor Nach6",), ("Vor Nach1",), ("Hof 2",), ("Hof 1",), "irregular"),
+    (("Vor Nach9",), (), ("Hof 1",), (), None),
+    (("Vor Nach12",), (), ("Hof 1",), (), None),
+}
+
+
+def test_get_day_loads_the_week_and_resolves_names(server, index):
+    monday = index.get_day(MONDAY)
+    assert list(monday) == [datetime.datetime(2024, 3, 4, 9, 30)]
+    assert _names(monday) == EXPECTED_MONDAY
+    assert index.get_day(FRIDAY) == {}
+    assert index.failed_teachers(MONDAY) == []
+    # one sweep for the whole week, names come from a single getTeachers and getRooms
+    assert server.counts["getTimetable"] == TEACHERS
+    assert server.counts["getTeachers"] == 1
+    assert server.counts["getRooms"] == 1
+
+
+def test_holidays_need_no_sweep(server, index):
+    assert index.get_day(HOLIDAY) == {}
+    assert "getTimetable" not in server.counts
+    assert index.next_school_day(MONDAY + datetime.timedelta(days=1)) == HOLIDAY + datetime.timedelta(days=1)
+
+
+def test_refresh_fetches_again_only_after_a_new_import(server, index):
+    index.get_day(MONDAY)
+    assert index.refresh() is False
+    index.get_day(MONDAY)
+    assert server.counts["getTimetable"] == TEACHERS
+
+    server.import_time = 1800000000000
+    assert index.refresh() is True
+    assert not index.is_loaded(MONDAY)
+    assert _names(index.get_day(MONDAY)) == EXPECTED_MONDAY
+    # only the learned roster of supervising teachers is asked again
+    assert server.counts["getTimetable"] == TEACHERS + len(EXPECTED_MONDAY)
+
+
+@pytest.mark.parametrize("recording, retries", [(_recording(failing=(5,)), {"retries": 0})])
+def test_a_sweep_with_failed_teachers_is_not_full(server, index):
+    index.get_day(MONDAY)
+    assert index.failed_teachers(MONDAY) == ["Vor Nach5"]
+    assert index.refresh() is False
+    index.get_day(MONDAY)
+    # teacher 5 might supervise, so all teachers are asked again instead of the learned roster
+    assert server.counts["getTimetable"] == 2 * TEACHERS
+
+
+@pytest.mark.parametrize("workers", [1])
+def test_a_cancelled_load_stops_after_the_next_teacher(server, index):
+    # as the prefetch of DisplayFrame does once a reload cancels it
+    token = TKUtils.CancelToken()
+    token.cancel()
+    with pytest.raises(TKUtils.JobCancelled):
+        index.get_day(MONDAY, on_progress=lambda *progress: token.check())
+    assert not index.is_loaded(MONDAY)
+    assert server.counts["getTimetable"] < TEACHERS
+
+
+@pytest.mark.parametrize("faults, workers", [({"expire_after": 5}, 1)])
+def test_expired_sessions_log_in_again(server, index):
+    assert _names(index.get_day(MONDAY)) == EXPECTED_MONDAY
+    assert index.failed_teachers(MONDAY) == []
+    assert server.counts["authenticate"] > 1
+
+
+@pytest.mark.parametrize("faults, retries", [({"error_rate": 0.3}, {"retries": 10, "backoff": 0.001, "max_backoff": 0.01})])
+def test_injected_errors_are_retried(server, index):
+    random.seed(4)
+    assert _names(index.get_day(MONDAY)) == EXPECTED_MONDAY
+    assert index.failed_teachers(MONDAY) == []
+    assert sum(server.counts.values()) > TEACHERS + 6
+
+
+@pytest.mark.parametrize("recording", [_recording(without=("getHolidays",))])
+def test_a_missing_calendar_is_not_requested_on_every_load(server, index):
+    assert _names(index.get_day(MONDAY)) == EXPECTED_MONDAY
+    # plain weekdays until CALENDAR_RETRY_MINUTES are over, the holiday is a school day then
+    assert index.get_day(HOLIDAY) == {}
+    assert index.get_day(FRIDAY) == {}
+    assert server.counts["getHolidays"] == 1
+
+
+@pytest.mark.parametrize("recording, retries", [(_recording(without=("getRooms",)), {"backoff": 0.001})])
+def test_errors_that_stay_are_not_retried(server, index):
+    with pytest.raises(webuntis.errors.MethodNotFoundError):
+        index.get_day(MONDAY)
+    assert server.counts["getRooms"] == 1
@@ -0,0 +1,49 @@
+import pytest
+import webuntis
+
+from src import RequestScheduler
+
+
+'''
+Fails with the given errors one after the other, then answers "ok".
+'''
+class _Flaky:
+
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+def _scheduler(retries: int=3) -> RequestScheduler.RequestScheduler:
+    return RequestScheduler.RequestScheduler(rate=1000, burst=10, retries=retries, backoff=0.001, max_backoff=0.001)
+
+
+def test_transient_errors_are_retried():
+    fetch = _Flaky(ConnectionResetError(), webuntis.errors.RemoteError("busy"))
+    assert _scheduler().run(fetch) == "ok"
+    assert fetch.calls == 3
+
+
+def test_retries_are_limited():
+    fetch = _Flaky(*[TimeoutError()] * 5)
+    with pytest.raises(TimeoutError):
+        _scheduler(retries=2).run(fetch)
+    assert fetch.calls == 3
+
+
+@pytest.mark.parametrize("error", [webuntis.errors.BadCredentialsError("wrong password"),
+                                   webuntis.errors.MethodNotFoundError("no such method"),
+                                   webuntis.errors.DateNotAllowed("outside the school year")])
+def test_errors_that_stay_are_not_retried(error):
+    fetch = _Flaky(error)
+    with pytest.raises(type(error)):
+        _scheduler().run(fetch)
+    assert fetch.calls == 1
@@ -0,0 +1,36 @@
+from datetime import date
+
+from src import SchoolCalendar
+
+
+EASTER = (date(2024, 3, 25), date(2024, 4, 5), "Osterferien")
+SCHOOLYEAR = (date(2023, 9, 1), date(2024, 7, 31))
+
+
+def test_next_school_day_skips_weekends_and_holidays():
+    calendar = SchoolCalendar.SchoolCalendar([EASTER], [SCHOOLYEAR])
+    assert calendar.next_school_day(date(2024, 3, 4)) == date(2024, 3, 5)
+    assert calendar.next_school_day(date(2024, 3, 8)) == date(2024, 3, 11)
+    assert calendar.next_school_day(date(2024, 3, 22)) == date(2024, 4, 8)
+    assert calendar.holiday(date(2024, 4, 1)) == "Osterferien"
+    assert not calendar.is_school_day(date(2024, 4, 1))
+
+
+def test_next_school_day_outside_the_known_school_years():
+    calendar = SchoolCalendar.SchoolCalendar([], [SCHOOLYEAR])
+    # no school day left after the school year: plain next weekday
+    assert calendar.next_school_day(date(2024, 7, 31)) == date(2024, 8, 1)
+    assert calendar.next_school_day(date(2024, 8, 2)) == date(2024, 8, 5)
+
+
+def test_without_school_years_every_weekday_outside_holidays_counts():
+    calendar = SchoolCalendar.SchoolCalendar([EASTER], [])
+    assert calendar.next_school_day(date(2024, 3, 22)) == date(2024, 4, 8)
+    assert SchoolCalendar.SchoolCalendar([], []).next_school_day(date(2024, 3, 9)) == date(2024, 3, 11)
+
+
+def test_json_round_trip():
+    calendar = SchoolCalendar.SchoolCalendar([EASTER], [SCHOOLYEAR])
+    restored = SchoolCalendar.SchoolCalendar.from_json(calendar.to_json())
+    assert restored.holidays == calendar.holidays
+    assert restored.schoolyears == calendar.schoolyears
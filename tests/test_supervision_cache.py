@@ -0,0 +1,42 @@
+from datetime import date, datetime, timedelta
+
+from src import SupervisionCache, UntisBreaks
+
+
+DAY = date.today() + timedelta(days=1)
+START = datetime.combine(DAY, datetime.min.time()).replace(hour=9, minute=30)
+
+
+def _day() -> dict:
+    first = UntisBreaks.Supervision(1, START, START + timedelta(minutes=20), None, ("Vor Nach3",), (), ("Hof 1",), ())
+    second = UntisBreaks.Supervision(2, START, START + timedelta(minutes=20), "irregular", ("Vor Nach6",), ("Vor Nach1",), ("Hof 2",), ("Hof 1",))
+    return {START: [first, second]}
+
+
+def test_day_round_trip(tmp_path):
+    cache = SupervisionCache.SupervisionCache(str(tmp_path / "cache.db"))
+    cache.store_day("server", "school", DAY, _day())
+    assert cache.load_day("server", "school", DAY) == _day()
+    assert cache.load_day("server", "other school", DAY) is None
+    cache.evict()
+    assert cache.load_day("server", "school", DAY) == _day()
+
+
+def test_expired_days_are_not_returned(tmp_path):
+    cache = SupervisionCache.SupervisionCache(str(tmp_path / "cache.db"), ttl=timedelta(seconds=-1))
+    cache.store_day("server", "school", DAY, _day())
+    assert cache.load_day("server", "school", DAY) is None
+
+
+def test_serialized_day_round_trip():
+    assert SupervisionCache.deserialize_day(SupervisionCache.serialize_day(_day())) == _day()
+
+
+def test_roster_and_meta(tmp_path):
+    cache = SupervisionCache.SupervisionCache(str(tmp_path / "cache.db"))
+    cache.store_roster("server", "school", {3, 6})
+    assert set(cache.load_roster("server", "school", timedelta(days=1))) == {3, 6}
+    assert cache.load_roster("server", "school", timedelta(seconds=-1)) == {}
+    cache.store_meta("server", "school", "timegrid", {"fetched": "2024-03-04", "value": {"2": [["08:00", "08:45"]]}})
+    assert cache.load_meta("server", "school", "timegrid")["value"] == {"2": [["08:00", "08:45"]]}
+    assert cache.load_meta("server", "school", "calendar") is None
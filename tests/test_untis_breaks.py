@@ -0,0 +1,114 @@
+import datetime
+
+import pytest
+
+from src import Constants, SupervisionCache, UntisBreaks
+
+
+DAY = datetime.date(2024, 3, 4)     # a Monday, untis weekday 2
+
+
+def _at(hour: int, minute: int=0) -> datetime.datetime:
+    return datetime.datetime.combine(DAY, datetime.time(hour, minute))
+
+
+BREAKS = [_at(11, 20), _at(9, 30), _at(13, 0), _at(9, 30)]
+PROBES = [_at(7), _at(9, 30), _at(9, 31), _at(11, 20), _at(12), _at(13), _at(15)]
+
+
+@pytest.mark.parametrize("current", PROBES)
+def test_next_matches_next_break_time(current):
+    assert UntisBreaks.BreakSchedule(BREAKS).next(current) == UntisBreaks.next_break_time(BREAKS, current)
+
+
+@pytest.mark.parametrize("offset", [-3, -1, 0, 1, 2])
+@pytest.mark.parametrize("selected", sorted(set(BREAKS)))
+def test_relative_matches_get_relative_break(selected, offset):
+    breaks = sorted(set(BREAKS))
+    assert UntisBreaks.BreakSchedule(BREAKS).relative(selected, offset) == UntisBreaks.get_relative_break(selected, breaks, offset)
+
+
+def test_schedule_edge_cases():
+    schedule = UntisBreaks.BreakSchedule(BREAKS)
+    assert len(schedule) == 3
+    assert _at(11, 20) in schedule and _at(11, 21) not in schedule
+    assert schedule.previous(_at(11, 20)) == _at(9, 30)
+    assert schedule.current_at(_at(11, 20)) == _at(11, 20)
+    assert schedule.current_at(_at(8)) is None
+    assert schedule.relative(None, 1) is None
+    with pytest.raises(ValueError):
+        schedule.relative(_at(10), 1)
+    assert UntisBreaks.BreakSchedule([]).next(_at(8)) is None
+
+
+class _Period:
+    def __init__(self, data=None):
+        self.id, self.start, self.end, self.code = 1, _at(9, 30), _at(9, 50), None
+        if data is not None: self._data = data
+
+
+NAMES = ({3: "Vor Nach3", 6: "Vor Nach6"}, {1: "Hof 1"})
+
+
+def _names(supervision) -> tuple:
+    return supervision.teachers, supervision.original_teachers, supervision.rooms, supervision.original_rooms
+
+
+def test_supervision_names_by_id():
+    period = _Period({"te": [{"id": 6, "orgid": 3}, {"id": 0}], "ro": [{"id": 1}]})
+    assert _names(UntisBreaks.Supervision.from_period(period, NAMES)) == (("Vor Nach6",), ("Vor Nach3",), ("Hof 1",), ())
+
+
+def test_supervision_without_element_ids():
+    assert _names(UntisBreaks.Supervision.from_period(_Period({"te": [{"orgid": 3}]}), NAMES)) == ((), ("Vor Nach3",), (), ())
+    assert _names(UntisBreaks.Supervision.from_period(_Period(), NAMES)) == ((), (), (), ())
+
+
+class _Teacher:
+    def __init__(self, id): self.id = id
+
+
+class _Session:
+    config = {"server": "server", "school": "school"}
+
+
+TEACHERS = [_Teacher(i) for i in range(1, 13)]
+
+
+def test_roster_sweeps_all_teachers_until_it_knows_the_supervisors(tmp_path):
+    roster = UntisBreaks.SupervisorRoster(_Session(), SupervisionCache.SupervisionCache(str(tmp_path / "cache.db")))
+    teachers, full = roster.select(TEACHERS)
+    assert (len(teachers), full) == (12, True)
+    roster.learn({3, 6}, full)
+    teachers, full = roster.select(TEACHERS)
+    assert ([t.id for t in teachers], full) == ([3, 6], False)
+    # a new display of the same school starts from the stored roster
+    restored = UntisBreaks.SupervisorRoster(_Session(), SupervisionCache.SupervisionCache(str(tmp_path / "cache.db")))
+    assert [t.id for t in restored.select(TEACHERS)[0]] == [3, 6]
+
+
+def test_roster_forgets_teachers_after_the_keep_days(monkeypatch):
+    roster = UntisBreaks.SupervisorRoster(_Session())
+    roster.learn({3, 6}, True)
+    assert roster.select(TEACHERS)[1] is False
+    monkeypatch.setattr(Constants, "ROSTER_KEEP_DAYS", 0)
+    teachers, full = roster.select(TEACHERS)
+    assert (len(teachers), full) == (12, True)
+
+
+class _Unit:
+    def __init__(self, start, end): self.start, self.end = start, end
+
+
+class _Day:
+    def __init__(self, day, units): self.day, self.time_units = day, units
+
+
+def test_timegrid_breaks():
+    units = [_Unit(935, 1020), _Unit(800, 845), _Unit(1040, 1125), _Unit(845, 930), _Unit(1125, 1210)]
+    # Tuesday without a gap between its units
+    table = UntisBreaks.timegrid_table([_Day(2, units), _Day(3, [_Unit(800, 845), _Unit(845, 930)])])
+    assert table["2"][0] == ["09:35", "10:20"]
+    assert UntisBreaks.timegrid_breaks(table, DAY) == [_at(9, 30), _at(10, 20)]
+    assert UntisBreaks.timegrid_breaks(table, DAY + datetime.timedelta(days=1)) == []
+    assert UntisBreaks.timegrid_breaks(table, DAY + datetime.timedelta(days=5)) == []